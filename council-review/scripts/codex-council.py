@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Run several Codex reviews concurrently under one deadline.
+
+Usage:
+    python3 codex-council.py uncommitted [options]
+    python3 codex-council.py branch [--base <branch>] [options]
+    python3 codex-council.py commit <SHA> [options]
+    python3 codex-council.py --reviewer <spec> [--reviewer <spec>...] [options]
+
+Each reviewer is one `codex exec review` process (same model and read-only
+setup as codex-review.py). All reviewers start at once; their agent_message
+output is streamed to stdout as it arrives, one line per output line,
+prefixed with "[<reviewer>] ". When every reviewer has finished, or the
+deadline passes and stragglers are cancelled, a merged JSON result is
+written and its path printed as the last line: "council-result: <path>".
+
+Options:
+    --base <branch>         Base branch for the branch scope (default: main)
+    --efforts <list>        One reviewer per reasoning effort for the scope
+                            subcommand (default: xhigh,medium)
+    --reviewer <spec>       Add a reviewer: <scope>[@<effort>], where scope is
+                            uncommitted, branch[:<base>] or commit:<sha>
+                            (repeatable; effort defaults to xhigh)
+    --deadline <seconds>    Cancel reviewers still running after this long
+                            (default: 1800)
+    --output <path>         Write the merged JSON here (default: a temp file)
+    --metrics <file>        Append per-reviewer timings and token usage as
+                            NDJSON (default: $CODEX_METRICS_FILE)
+    --dry-run               Print the reviewer commands without running them
+
+Cancellation:
+    Every reviewer runs in its own process group. At the deadline (or on
+    Ctrl-C / SIGTERM) each straggler's group gets SIGTERM, then SIGKILL after
+    5 seconds, so no Codex or helper process outlives the council.
+
+Merged JSON:
+    {"deadline": s, "wall_seconds": s,
+     "reviewers": [{"name", "scope", "target", "effort", "status",
+                    "exit_code", "seconds", "thread_id", "messages"}, ...],
+     "findings": [{"text", "reviewers": [name, ...]}, ...]}
+    status is ok, failed (non-zero exit), timed_out (deadline) or cancelled
+    (Ctrl-C / SIGTERM; the partial result is still written, exit 130). findings are the
+    reviewers' messages split at each top-level list item or heading (at blank
+    lines when a message has neither), deduplicated across reviewers in
+    first-seen order.
+    Exits 0 when every reviewer succeeded, 1 otherwise.
+"""
+
+import importlib.util
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REVIEW_SCRIPT = os.path.join(HERE, "codex-review.py")
+
+DEFAULT_EFFORTS = ("xhigh", "medium")
+DEFAULT_DEADLINE = 1800
+KILL_GRACE = 5.0
+
+
+def load_codex_review():
+    spec = importlib.util.spec_from_file_location("codex_review", REVIEW_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+cr = load_codex_review()
+fail = cr.fail
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def parse_reviewer(spec):
+    """Parse "<scope>[@<effort>]" into a reviewer dict."""
+    scope, _, effort = spec.partition("@")
+    scope, _, target = scope.partition(":")
+    if scope == "uncommitted" and not target:
+        scope_args = ("--uncommitted",)
+    elif scope == "branch":
+        target = target or "main"
+        scope_args = ("--base", target)
+    elif scope == "commit" and target:
+        scope_args = ("--commit", target)
+    else:
+        fail(f"Invalid reviewer '{spec}'. Use uncommitted, branch[:<base>] or commit:<sha>, optionally @<effort>.")
+    effort = effort or cr.REASONING_EFFORT
+    return {
+        "name": spec if "@" in spec else f"{spec}@{effort}",
+        "scope": scope,
+        "target": target or None,
+        "effort": effort,
+        "cmd": cr.review_cmd(*scope_args, effort=effort),
+    }
+
+
+class Reviewer:
+    """One Codex review process whose messages are streamed and collected."""
+
+    def __init__(self, spec, metrics_path, print_lock):
+        self.spec = spec
+        self.name = spec["name"]
+        self.metrics = cr.RunMetrics(metrics_path, f"council-{spec['scope']}")
+        self.print_lock = print_lock
+        self.messages = []
+        self.proc = None
+        self.returncode = None
+        self.cancelled = None  # "timed_out" or "cancelled" once stopped early
+        self.seconds = None
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.waiter = threading.Thread(target=self._wait, daemon=True)
+
+    def start(self):
+        self.started = time.monotonic()
+        self.proc = subprocess.Popen(
+            self.spec["cmd"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            start_new_session=True,  # own process group, so cancel() reaches Codex's children
+        )
+        self.metrics.spawned()
+        self.reader.start()
+        self.waiter.start()
+
+    def _read(self):
+        try:
+            for text in cr.iter_agent_messages(self.proc.stdout, self.metrics):
+                self.messages.append(text)
+                with self.print_lock:
+                    for line in text.splitlines():
+                        print(f"[{self.name}] {line}".rstrip())
+                    sys.stdout.flush()
+        finally:
+            self.proc.stdout.close()
+
+    def _wait(self):
+        self.proc.wait()
+        self.seconds = round(time.monotonic() - self.started, 3)
+        # Helpers Codex left behind would hold the output pipe open
+        self._signal(signal.SIGKILL)
+
+    def _signal(self, sig):
+        try:
+            os.killpg(self.proc.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def cancel(self, status):
+        """Terminate the reviewer's process group, escalating to SIGKILL."""
+        if self.proc.poll() is not None:
+            return
+        self.cancelled = status
+        self._signal(signal.SIGTERM)
+        try:
+            self.proc.wait(KILL_GRACE)
+        except subprocess.TimeoutExpired:
+            self._signal(signal.SIGKILL)
+
+    def result(self):
+        self.waiter.join()
+        self.reader.join(KILL_GRACE)
+        returncode = self.proc.wait()
+        self.metrics.finish(returncode)
+        if self.cancelled:
+            status = self.cancelled
+        elif returncode != 0:
+            status = "failed"
+        else:
+            status = "ok"
+        return {
+            "name": self.name,
+            "scope": self.spec["scope"],
+            "target": self.spec["target"],
+            "effort": self.spec["effort"],
+            "status": status,
+            "exit_code": returncode,
+            "seconds": self.seconds,
+            "thread_id": self.metrics.record.get("thread_id"),
+            "messages": self.messages,
+        }
+
+
+def merge_findings(results):
+    findings = []
+    by_key = {}
+    for result in results:
+        for key, text in cr.split_findings(result["messages"]):
+            if key in by_key:
+                if result["name"] not in by_key[key]["reviewers"]:
+                    by_key[key]["reviewers"].append(result["name"])
+                continue
+            by_key[key] = {"text": text, "reviewers": [result["name"]]}
+            findings.append(by_key[key])
+    return findings
+
+
+def run_council(specs, deadline, output, metrics_path):
+    print_lock = threading.Lock()
+    reviewers = [Reviewer(spec, metrics_path, print_lock) for spec in specs]
+
+    def terminated(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, terminated)
+
+    started = time.monotonic()
+    deadline_at = started + deadline
+    status, reason = "timed_out", f"deadline of {deadline:g}s reached"
+    try:
+        for reviewer in reviewers:
+            reviewer.start()
+        for reviewer in reviewers:
+            reviewer.waiter.join(max(0.0, deadline_at - time.monotonic()))
+    except KeyboardInterrupt:
+        status, reason = "cancelled", "interrupted"
+    finally:
+        # Stop stragglers in parallel so cleanup takes one grace period at most
+        stragglers = [r for r in reviewers if r.proc is not None and r.proc.poll() is None]
+        for reviewer in stragglers:
+            print(f"Cancelling {reviewer.name}: {reason}", file=sys.stderr)
+        cancellers = [threading.Thread(target=r.cancel, args=(status,)) for r in stragglers]
+        for thread in cancellers:
+            thread.start()
+        for thread in cancellers:
+            thread.join()
+
+    results = [reviewer.result() for reviewer in reviewers if reviewer.proc is not None]
+    merged = {
+        "deadline": deadline,
+        "wall_seconds": round(time.monotonic() - started, 3),
+        "reviewers": results,
+        "findings": merge_findings(results),
+    }
+
+    if not output:
+        handle = tempfile.NamedTemporaryFile(
+            prefix="codex-council-", suffix=".json", delete=False, mode="w"
+        )
+        output = handle.name
+        handle.close()
+    with open(output, "w") as f:
+        json.dump(merged, f, indent=2)
+        f.write("\n")
+
+    for result in results:
+        print(f"{result['name']}: {result['status']} in {result['seconds']:.1f}s", file=sys.stderr)
+    print(f"\ncouncil-result: {output}")
+    if status == "cancelled":
+        return 130
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+def parse_args(args):
+    opts = {
+        "scope": None,
+        "target": None,
+        "base": "main",
+        "efforts": list(DEFAULT_EFFORTS),
+        "reviewers": [],
+        "deadline": float(DEFAULT_DEADLINE),
+        "output": "",
+        "metrics": os.environ.get("CODEX_METRICS_FILE", ""),
+        "dry_run": False,
+    }
+    i = 0
+    if args and args[0] in ("uncommitted", "branch", "commit"):
+        opts["scope"] = args[0]
+        i = 1
+        if args[0] == "commit":
+            if len(args) < 2 or args[1].startswith("--"):
+                fail("Usage: codex-council.py commit <SHA> [options]")
+            opts["target"] = args[1]
+            i = 2
+    while i < len(args):
+        if args[i] in ("--base", "--efforts", "--reviewer", "--deadline", "--output", "--metrics"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            value = args[i + 1]
+            if args[i] == "--efforts":
+                opts["efforts"] = [e for e in value.split(",") if e]
+            elif args[i] == "--reviewer":
+                opts["reviewers"].append(value)
+            elif args[i] == "--deadline":
+                try:
+                    opts["deadline"] = float(value)
+                except ValueError:
+                    fail(f"--deadline must be a number, got '{value}'")
+                if opts["deadline"] <= 0:
+                    fail("--deadline must be positive")
+            else:
+                opts[args[i][2:]] = value
+            i += 2
+        elif args[i] == "--dry-run":
+            opts["dry_run"] = True
+            i += 1
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        else:
+            fail(f"Unknown option: {args[i]}")
+    return opts
+
+
+def main():
+    if len(sys.argv) < 2:
+        usage()
+        sys.exit(1)
+    opts = parse_args(sys.argv[1:])
+
+    specs = []
+    if opts["scope"]:
+        scope = opts["scope"]
+        if scope == "branch":
+            scope = f"branch:{opts['base']}"
+        elif scope == "commit":
+            scope = f"commit:{opts['target']}"
+        specs += [parse_reviewer(f"{scope}@{effort}") for effort in opts["efforts"]]
+    specs += [parse_reviewer(spec) for spec in opts["reviewers"]]
+    if not specs:
+        fail("Give a scope subcommand or at least one --reviewer")
+
+    seen = {}
+    for spec in specs:
+        seen[spec["name"]] = seen.get(spec["name"], 0) + 1
+        if seen[spec["name"]] > 1:
+            spec["name"] += f"#{seen[spec['name']]}"
+
+    if opts["dry_run"]:
+        print("=== DRY RUN ===")
+        print(f"Deadline: {opts['deadline']:g}s")
+        for spec in specs:
+            print(f"[{spec['name']}] {' '.join(spec['cmd'])}")
+        return
+
+    cr.require_codex()
+    sys.exit(run_council(specs, opts["deadline"], opts["output"], opts["metrics"]))
+
+
+if __name__ == "__main__":
+    main()
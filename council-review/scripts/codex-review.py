@@ -18,21 +18,89 @@ Options:
                             (ignored — Codex CLI does not support [PROMPT]
                             together with scope flags; the script accepts it
                             for interface parity; accepted but ignored)
-    --dry-run               Print the command without running Codex
+    --stream                Print each review message as soon as Codex emits
+                            it instead of after the run (no temp file)
+    --shards <n>            branch only: split the diff into n balanced groups
+                            of files/directories, review them concurrently,
+                            and merge the findings into one report
+    --jobs <n>              Max concurrent Codex processes for --shards
+                            (default: 4)
+    --incremental           branch only: review just the commits added since
+                            the last --incremental run on this branch and
+                            carry forward earlier findings on untouched lines
+    --metrics <file>        Append per-run timings and token usage to file as
+                            NDJSON (default: $CODEX_METRICS_FILE); summarize
+                            with codex-metrics.py
+    --no-cache              Neither read nor write the review cache
+    --refresh               Ignore a cached review, re-run, and overwrite it
+    --dry-run               Print the command (and cache status) without
+                            running Codex
 
 Notes:
     - Model is fixed to gpt-5.5 (codex review does not support profiles)
     - Codex CLI's [PROMPT] arg is mutually exclusive with --uncommitted,
       --base, and --commit. When --focus is provided, the script prints a
       warning and drops it instead of failing.
+
+Sharded review (branch --shards N):
+    Files changed since the merge base are grouped by directory (large
+    directories are split per file) and packed into N shards of similar
+    changed-line counts. Each shard runs its own Codex review, scoped by a
+    prompt listing its files, so --focus is honored here. Findings are merged
+    in shard order with duplicate findings dropped, followed by a per-shard
+    timing summary. With --stream, findings print as each shard finishes.
+    Exits with the first non-zero shard exit code.
+
+Incremental review (branch --incremental):
+    Each run records the reviewed HEAD and its findings per branch under
+    ~/.cache/codex-review/branches/. The next run reviews only
+    <last HEAD>..HEAD, then appends earlier findings whose cited path:line
+    ranges were not touched since, with line numbers shifted to HEAD. Falls
+    back to a whole-branch review when there is no earlier run, the base or
+    merge base changed, or the branch was rebased past the recorded HEAD.
+    State is only updated when Codex exits 0.
+
+Cache:
+    Successful reviews are stored under ~/.cache/codex-review/ (honors
+    XDG_CACHE_HOME), keyed by a SHA-256 of the scope's normalized diff plus
+    the model and reasoning effort. Re-running the same scope over a
+    byte-identical change set (e.g. after a rebase that did not touch the
+    reviewed hunks) prints the stored review immediately. Least recently used
+    entries are evicted once the cache exceeds CODEX_REVIEW_CACHE_MAX_MB
+    (default: 64).
 """
 
+import hashlib
 import json
 import os
+import re
 import shutil
 import subprocess
 import sys
-import tempfile
+import threading
+import time
+
+
+MODEL = "gpt-5.5"
+REASONING_EFFORT = "xhigh"
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "codex-review",
+)
+CACHE_MAX_BYTES = int(float(os.environ.get("CODEX_REVIEW_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+DIFF_FLAGS = ("--no-color", "--no-ext-diff", "--binary", "-U3")
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+# path:line or path:start-end, as Codex cites findings
+LOCATION_RE = re.compile(r"(?<![\w/.-])((?:[\w.@+-]+/)*[\w.@+-]+\.[\w]+):(\d+)(?:-(\d+))?")
+# Top-level list item ("- ", "* ", "1. ", "2) ") or Markdown heading
+FINDING_START_RE = re.compile(r"^ ?(?:[-*+]|\d+[.)]|#{1,6})\s")
+
+DEFAULT_SHARD_JOBS = 4
+SHARD_FILE_WEIGHT = 20
 
 
 def fail(msg):
@@ -49,45 +117,607 @@ def require_codex():
         fail("Codex CLI not found in PATH. Install with: npm i -g @openai/codex && codex login")
 
 
-def extract_response(raw_path):
-    """Extract agent_message text from Codex CLI JSONL output."""
+class RunMetrics:
+    """Timings and token usage of one Codex process, appended as NDJSON.
+
+    Times are milliseconds since just before the process was spawned. Nothing
+    is written unless a metrics path was given.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.started = time.monotonic()
+        self.record = {"script": "codex-review", "mode": mode, "started_at": round(time.time(), 3)}
+        self.usage = {}
+
+    def elapsed_ms(self):
+        return round((time.monotonic() - self.started) * 1000, 1)
+
+    def spawned(self):
+        self.record["spawn_ms"] = self.elapsed_ms()
+
+    def observe(self, event):
+        kind = event.get("type")
+        if kind == "thread.started" and "thread_started_ms" not in self.record:
+            self.record["thread_started_ms"] = self.elapsed_ms()
+            self.record["thread_id"] = event.get("thread_id")
+        elif kind == "item.completed" and "first_message_ms" not in self.record:
+            if event.get("item", {}).get("type") == "agent_message":
+                self.record["first_message_ms"] = self.elapsed_ms()
+        elif kind == "turn.completed":
+            for key, value in (event.get("usage") or {}).items():
+                if isinstance(value, int):
+                    self.usage[key] = self.usage.get(key, 0) + value
+
+    def finish(self, returncode):
+        if not self.path:
+            return
+        self.record.update(wall_ms=self.elapsed_ms(), exit_code=returncode, usage=self.usage)
+        line = json.dumps(self.record) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+def iter_agent_messages(lines, metrics=None):
+    """Yield agent_message text from Codex CLI JSONL lines as they arrive."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if metrics:
+            metrics.observe(event)
+        item = event.get("item", {})
+        if item.get("type") == "agent_message":
+            text = item.get("text", "").strip()
+            if text:
+                yield text
+
+
+def watch_codex(cmd, metrics, on_message=None, prompt=None):
+    """Run Codex, reading its JSONL events off the pipe as they arrive.
+
+    Memory is bounded by the longest single event rather than the whole run.
+    Calls on_message(text) per agent_message; returns (messages, returncode).
+    """
     messages = []
-    with open(raw_path, "r", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if prompt is not None else None,
+        stdout=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    metrics.spawned()
+    if prompt is not None:
+        try:
+            proc.stdin.write(prompt)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+    try:
+        for text in iter_agent_messages(proc.stdout, metrics):
+            if on_message:
+                on_message(text)
+            messages.append(text)
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        metrics.finish(returncode)
+    return messages, returncode
+
+
+def stream_codex(cmd, metrics):
+    """Run Codex and print each agent_message the moment its event arrives.
+
+    Returns (response, returncode).
+    """
+    def show(text):
+        if shown:
+            print()
+        print(text, flush=True)
+        shown.append(text)
+
+    shown = []
+    messages, returncode = watch_codex(cmd, metrics, on_message=show)
+    return "\n\n".join(messages), returncode
+
+
+def capture_codex(cmd, metrics):
+    """Run Codex to completion and return (response, returncode)."""
+    messages, returncode = watch_codex(cmd, metrics)
+    return "\n\n".join(messages), returncode
+
+
+def git(*args):
+    return subprocess.run(["git", *args], capture_output=True, check=True).stdout
+
+
+def scope_diff(scope, target=None):
+    """Return the change set Codex would review for a scope, normalized.
+
+    `index <blob>..<blob>` lines are dropped so the same edit hashes the same
+    way regardless of the blobs around it; hunk headers are kept so cached
+    findings never point at shifted line numbers.
+    """
+    git("rev-parse", "--git-dir")  # fail fast, with a readable error, outside a repo
+    if scope == "uncommitted":
+        try:
+            git("rev-parse", "--verify", "-q", "HEAD")
+            head = "HEAD"
+        except subprocess.CalledProcessError:
+            head = EMPTY_TREE  # no commits yet
+        parts = [git("diff", *DIFF_FLAGS, head)]
+        untracked = [p for p in git("ls-files", "--others", "--exclude-standard", "-z").split(b"\0") if p]
+        if untracked:
+            blobs = subprocess.run(
+                ["git", "hash-object", "--stdin-paths"],
+                input=b"\n".join(untracked),
+                capture_output=True,
+                check=True,
+            ).stdout.split()
+            parts += [b"untracked " + path + b" " + blob + b"\n" for path, blob in zip(untracked, blobs)]
+    elif scope == "branch":
+        merge_base = git("merge-base", target, "HEAD").strip().decode()
+        parts = [git("diff", *DIFF_FLAGS, merge_base, "HEAD")]
+    else:
+        parts = [git("show", "--format=", *DIFF_FLAGS, target)]
+
+    lines = b"".join(parts).splitlines(keepends=True)
+    return b"".join(line for line in lines if not line.startswith(b"index "))
+
+
+def review_cache_key(scope, target=None, variant=""):
+    """Hash of the normalized diff plus model settings, or None outside git."""
+    try:
+        diff = scope_diff(scope, target)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", None)
+        detail = stderr.decode(errors="replace").strip().splitlines()[0] if stderr else e
+        print(f"Warning: review cache disabled — could not compute diff: {detail}", file=sys.stderr)
+        return None
+    digest = hashlib.sha256()
+    for part in (b"codex-review-v1", scope.encode(), variant.encode(), MODEL.encode(), REASONING_EFFORT.encode(), diff):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def cache_lookup(key):
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    os.utime(path)  # mark as recently used for eviction
+    return entry.get("response")
+
+
+def cache_store(key, scope, response):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"scope": scope, "created": time.time(), "response": response}, f)
+    os.replace(tmp, path)
+    evict_cache(CACHE_MAX_BYTES)
+
+
+def evict_cache(max_bytes):
+    """Delete least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".json"):
             try:
-                event = json.loads(line)
-            except json.JSONDecodeError:
+                st = os.stat(os.path.join(CACHE_DIR, name))
+            except OSError:
                 continue
-            item = event.get("item", {})
-            if item.get("type") == "agent_message":
-                text = item.get("text", "").strip()
-                if text:
-                    messages.append(text)
-    return "\n\n".join(messages)
+            entries.append((st.st_mtime, st.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(os.path.join(CACHE_DIR, name))
+        except OSError:
+            pass
+        total -= size
+
+
+def open_cache(opts, scope, target=None, variant=""):
+    """Return (cache key, cached review or None) for this run.
+
+    Under --dry-run, also prints whether the run would be a cache hit.
+    """
+    if opts["cache"] == "off":
+        return None, None
+    cache_key = review_cache_key(scope, target, variant)
+    if not cache_key:
+        return None, None
+    cached = cache_lookup(cache_key) if opts["cache"] != "refresh" else None
+    if opts["dry_run"]:
+        print(f"Cache: {'hit' if cached is not None else 'miss'} ({cache_key[:16]})")
+    elif cached is not None:
+        print(f"Using cached review {cache_key[:16]} (--refresh to re-run)", file=sys.stderr)
+    return cache_key, cached
+
+
+def review(cmd, opts, scope, target=None):
+    """Run one review (or replay it from the cache) and print it.
+
+    Returns (response, returncode).
+    """
+    cache_key, cached = open_cache(opts, scope, target)
+    if cached is not None:
+        print(cached)
+        return cached, 0
+
+    metrics = RunMetrics(opts["metrics"], scope)
+    if opts["stream"]:
+        response, returncode = stream_codex(cmd, metrics)
+    else:
+        response, returncode = capture_codex(cmd, metrics)
+        print(response)
+
+    if cache_key and returncode == 0 and response:
+        cache_store(cache_key, scope, response)
+    return response, returncode
 
 
-def run_codex(cmd, dry_run):
-    if dry_run:
+def run_codex(cmd, opts, scope, target=None):
+    if opts["dry_run"]:
         print("=== DRY RUN ===")
         print(f"Command: {' '.join(cmd)}")
+        open_cache(opts, scope, target)
         return
+    sys.exit(review(cmd, opts, scope, target)[1])
+
+
+def changed_files(merge_base):
+    """Return [(path, changed lines)] for merge_base..HEAD."""
+    fields = git("diff", "--numstat", "-z", "--no-renames", merge_base, "HEAD").decode(errors="replace")
+    changes = []
+    for record in fields.split("\0"):
+        if record:
+            added, deleted, path = record.split("\t", 2)
+            # Binary files report "-"; count them as one line
+            lines = int(added) + int(deleted) if added != "-" else 1
+            changes.append((path, lines))
+    return changes
+
+
+def plan_shards(changes, count):
+    """Split [(path, lines)] into at most `count` groups of similar size.
+
+    Files stay grouped by directory unless a directory alone is bigger than
+    a fair share, so each Codex process sees related code together. Groups
+    are filled largest-first into whichever shard is currently lightest.
+    """
+    # Every file costs at least a little reviewer attention, even renames
+    weighted = [(path, lines + SHARD_FILE_WEIGHT) for path, lines in changes]
+    fair_share = sum(weight for _, weight in weighted) / count
+
+    by_dir = {}
+    for path, weight in weighted:
+        by_dir.setdefault(os.path.dirname(path), []).append((path, weight))
+    groups = []
+    for entries in by_dir.values():
+        total = sum(weight for _, weight in entries)
+        if total > fair_share and len(entries) > 1:
+            groups += [([path], weight) for path, weight in entries]
+        else:
+            groups.append(([path for path, _ in entries], total))
+
+    shards = [{"files": [], "weight": 0} for _ in range(count)]
+    for paths, weight in sorted(groups, key=lambda g: (-g[1], g[0])):
+        lightest = min(shards, key=lambda shard: shard["weight"])
+        lightest["files"] += paths
+        lightest["weight"] += weight
+    return [shard for shard in shards if shard["files"]]
+
+
+def shard_prompt(merge_base, files, focus):
+    lines = [
+        f"Review the code changes between commit {merge_base} and HEAD, limited to "
+        f"the files listed below. The rest of the branch is reviewed separately, so "
+        f"report only findings located in these files. Inspect the changes with "
+        f"`git diff {merge_base} HEAD -- <path>` and read surrounding code as needed. "
+        f"Prioritize correctness, security, and regressions; cite file:line for "
+        f"every finding.",
+    ]
+    if focus:
+        lines.append(f"Focus: {focus}")
+    lines.append("")
+    lines.append("Files:")
+    lines += [f"- {path}" for path in sorted(files)]
+    return "\n".join(lines) + "\n"
+
+
+def review_shard(cmd, prompt, metrics_path, mode):
+    """Run one shard's Codex process; returns (messages, returncode, seconds)."""
+    # Built here, not at submit, so time spent queued for a worker is not
+    # counted in the shard's timings
+    metrics = RunMetrics(metrics_path, mode)
+    started = time.monotonic()
+    messages, returncode = watch_codex(cmd, metrics, prompt=prompt)
+    return messages, returncode, time.monotonic() - started
+
+
+def split_findings(messages):
+    """Yield (dedupe key, text) for each finding in the messages.
+
+    A finding starts at a top-level list item or heading and runs to the next
+    one, so its title, explanation and path:line stay one unit even when they
+    are separate paragraphs. Text before the first item is a block of its own.
+    Messages without any list item or heading are split on blank lines.
+    """
+    for message in messages:
+        lines = message.splitlines()
+        if any(FINDING_START_RE.match(line) for line in lines):
+            blocks, current = [], []
+            for line in lines:
+                if FINDING_START_RE.match(line) and current:
+                    blocks.append("\n".join(current))
+                    current = []
+                current.append(line)
+            blocks.append("\n".join(current))
+        else:
+            blocks = message.split("\n\n")
+        for block in blocks:
+            block = block.strip()
+            if block:
+                yield " ".join(block.lower().split()), block
 
-    raw = tempfile.NamedTemporaryFile(
-        prefix="codex-review-raw-", suffix=".jsonl", delete=False, mode="w"
-    )
+
+def run_sharded(base, opts):
     try:
-        result = subprocess.run(cmd, stdout=raw)
-    finally:
-        raw.close()
+        merge_base = git("merge-base", base, "HEAD").strip().decode()
+        changes = changed_files(merge_base)
+    except subprocess.CalledProcessError as e:
+        fail(f"could not diff against '{base}': {e.stderr.decode(errors='replace').strip()}")
+    shards = plan_shards(changes, opts["shards"])
+    if len(shards) <= 1:
+        # Nothing to split; a single scoped review is cheaper and just as fast
+        warn_focus_ignored(opts["focus"])
+        run_codex(review_cmd("--base", base), opts, "branch", base)
+        return
 
-    response = extract_response(raw.name)
-    os.unlink(raw.name)
+    cmd = review_cmd("-")
+    prompts = [shard_prompt(merge_base, shard["files"], opts["focus"]) for shard in shards]
+    jobs = min(opts["jobs"] or DEFAULT_SHARD_JOBS, len(shards))
+    variant = f"shards={len(shards)} focus={opts['focus']}"
 
-    print(response)
-    sys.exit(result.returncode)
+    if opts["dry_run"]:
+        print("=== DRY RUN ===")
+        print(f"Command: {' '.join(cmd)}  (prompt on stdin, {len(shards)} shards, {jobs} at a time)")
+        for number, shard in enumerate(shards, 1):
+            print(f"Shard {number}: {len(shard['files'])} files, ~{shard['weight']} lines")
+        open_cache(opts, "branch", base, variant)
+        return
+
+    cache_key, cached = open_cache(opts, "branch", base, variant)
+    if cached is not None:
+        print(cached)
+        sys.exit(0)
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    results = [None] * len(shards)
+    seen = set()
+    findings = []
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(review_shard, cmd, prompt, opts["metrics"], "branch-shard"): i
+            for i, prompt in enumerate(prompts)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if opts["stream"]:
+                # Print findings in completion order so early shards show up at once
+                for key, text in split_findings(results[index][0]):
+                    if key not in seen:
+                        seen.add(key)
+                        findings.append(text)
+                        print(text + "\n", flush=True)
+    wall = time.monotonic() - started
+
+    if not opts["stream"]:
+        for messages, _, _ in results:
+            for key, text in split_findings(messages):
+                if key not in seen:
+                    seen.add(key)
+                    findings.append(text)
+
+    timing = [f"Shards: {len(shards)} ({jobs} concurrent), wall {wall:.1f}s"]
+    for number, (shard, (_, returncode, seconds)) in enumerate(zip(shards, results), 1):
+        timing.append(
+            f"  shard {number}: {len(shard['files'])} files, ~{shard['weight']} lines, "
+            f"{seconds:.1f}s, exit {returncode}"
+        )
+    timing = "\n".join(timing)
+    report = "\n\n".join(findings + [timing])
+    print(timing if opts["stream"] else report)
+
+    returncode = next((rc for _, rc, _ in results if rc != 0), 0)
+    if cache_key and returncode == 0 and findings:
+        cache_store(cache_key, "branch", report)
+    sys.exit(returncode)
+
+
+def state_path(branch):
+    toplevel = git("rev-parse", "--show-toplevel").strip()
+    key = hashlib.sha256(toplevel + b"\0" + branch.encode()).hexdigest()[:32]
+    return os.path.join(CACHE_DIR, "branches", f"{key}.json")
+
+
+def load_state(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def is_ancestor(commit, head):
+    return subprocess.run(
+        ["git", "merge-base", "--is-ancestor", commit, head], capture_output=True
+    ).returncode == 0
+
+
+def diff_hunks(since, head):
+    """Map each path changed in since..head to its (old_start, old_count, new_count) hunks."""
+    diff = git("diff", "-U0", "--no-color", "--no-ext-diff", "--no-renames", since, head)
+    hunks = {}
+    path = None
+    for line in diff.decode(errors="replace").splitlines():
+        if line.startswith("--- "):
+            # New files have no old lines, so nothing earlier can point into them
+            path = line[6:] if line.startswith("--- a/") else None
+        elif path and line.startswith("@@ "):
+            match = HUNK_RE.match(line)
+            if match:
+                old_start, old_count, _, new_count = match.groups()
+                hunks.setdefault(path, []).append(
+                    (int(old_start), 1 if old_count is None else int(old_count),
+                     1 if new_count is None else int(new_count))
+                )
+    return hunks
+
+
+def remap_range(start, end, hunks):
+    """Return (start, end) after the hunks apply, or None if any line was touched."""
+    shift = 0
+    for old_start, old_count, new_count in hunks:
+        if old_count:
+            if old_start <= end and start < old_start + old_count:
+                return None
+            before = old_start + old_count <= start
+        else:
+            # Pure insertion after old_start; inside the range counts as touched
+            if start <= old_start < end:
+                return None
+            before = old_start < start
+        if before:
+            shift += new_count - old_count
+    return start + shift, end + shift
+
+
+def carry_forward(findings, since, head):
+    """Keep earlier findings whose cited lines since..head did not touch.
+
+    Line numbers are shifted to where the lines are at head. Findings with
+    no path:line citation (summaries, headings) are not carried.
+    """
+    hunks = diff_hunks(since, head)
+    toplevel = git("rev-parse", "--show-toplevel").strip().decode() + "/"
+    carried = []
+    for text in findings:
+        cited = False
+        touched = False
+
+        def update(match):
+            nonlocal cited, touched
+            path, start = match.group(1), int(match.group(2))
+            end = int(match.group(3) or start)
+            relative = path[len(toplevel):] if path.startswith(toplevel) else path
+            cited = True
+            moved = remap_range(start, end, hunks.get(relative, ()))
+            if moved is None:
+                touched = True
+                return match.group(0)
+            if match.group(3):
+                return f"{path}:{moved[0]}-{moved[1]}"
+            return f"{path}:{moved[0]}"
+
+        updated = LOCATION_RE.sub(update, text)
+        if cited and not touched:
+            carried.append(updated)
+    return carried
+
+
+def run_incremental(base, opts):
+    try:
+        branch = git("rev-parse", "--abbrev-ref", "HEAD").strip().decode()
+        head = git("rev-parse", "HEAD").strip().decode()
+        merge_base = git("merge-base", base, "HEAD").strip().decode()
+        path = state_path(branch)
+    except subprocess.CalledProcessError as e:
+        fail(f"could not diff against '{base}': {e.stderr.decode(errors='replace').strip()}")
+
+    state = load_state(path)
+    since = None
+    if state is None:
+        note = f"No earlier review of '{branch}'; reviewing the whole branch."
+    elif state.get("base") != base or state.get("merge_base") != merge_base:
+        note = f"'{branch}' was last reviewed against a different base; reviewing the whole branch."
+    elif not is_ancestor(state["head"], head):
+        note = f"History of '{branch}' was rewritten since {state['head'][:12]}; reviewing the whole branch."
+    elif state["head"] == head:
+        since = head
+        note = f"No new commits on '{branch}' since the last review of {head[:12]}."
+    else:
+        since = state["head"]
+        note = f"Reviewing {since[:12]}..{head[:12]}; earlier findings on untouched lines are carried forward."
+
+    cmd = review_cmd("--base", since or base)
+    if opts["dry_run"]:
+        print("=== DRY RUN ===")
+        print(note)
+        if since != head:
+            print(f"Command: {' '.join(cmd)}")
+            open_cache(opts, "branch", since or base)
+        return
+
+    print(note, file=sys.stderr)
+    carried = carry_forward(state["findings"], since, head) if since else []
+    if since == head:
+        response, returncode = "", 0
+    else:
+        response, returncode = review(cmd, opts, "branch", since or base)
+
+    new = [text for _, text in split_findings([response])]
+    seen = {key for key, _ in split_findings(new)}
+    carried = [text for key, text in split_findings(carried) if key not in seen]
+    if carried:
+        if response:
+            print()
+        print(f"Carried forward from the review of {since[:12]} ({len(carried)}):\n")
+        print("\n\n".join(carried))
+
+    if returncode == 0:
+        save_state(path, {
+            "branch": branch,
+            "base": base,
+            "merge_base": merge_base,
+            "head": head,
+            "reviewed_at": time.time(),
+            "findings": new + carried,
+        })
+    sys.exit(returncode)
+
+
+def review_cmd(*scope_args, effort=REASONING_EFFORT):
+    return [
+        "codex", "exec", "review", *scope_args, "--json",
+        "-c", f"model={MODEL}",
+        "-c", f'model_reasoning_effort="{effort}"',
+    ]
 
 
 def warn_focus_ignored(focus):
@@ -100,18 +730,53 @@ def warn_focus_ignored(focus):
 
 
 def parse_common_opts(args):
-    focus = ""
-    dry_run = False
+    opts = {
+        "focus": "",
+        "dry_run": False,
+        "stream": False,
+        "cache": "use",
+        "shards": 1,
+        "jobs": 0,
+        "incremental": False,
+        "metrics": os.environ.get("CODEX_METRICS_FILE", ""),
+    }
     rest = []
     i = 0
     while i < len(args):
         if args[i] == "--focus":
             if i + 1 >= len(args):
                 fail("--focus requires a value")
-            focus = args[i + 1]
+            opts["focus"] = args[i + 1]
+            i += 2
+        elif args[i] in ("--shards", "--jobs"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            try:
+                opts[args[i][2:]] = int(args[i + 1])
+            except ValueError:
+                fail(f"{args[i]} must be an integer, got '{args[i + 1]}'")
+            if opts[args[i][2:]] < 1:
+                fail(f"{args[i]} must be at least 1")
+            i += 2
+        elif args[i] == "--metrics":
+            if i + 1 >= len(args):
+                fail("--metrics requires a value")
+            opts["metrics"] = args[i + 1]
             i += 2
+        elif args[i] == "--incremental":
+            opts["incremental"] = True
+            i += 1
         elif args[i] == "--dry-run":
-            dry_run = True
+            opts["dry_run"] = True
+            i += 1
+        elif args[i] == "--stream":
+            opts["stream"] = True
+            i += 1
+        elif args[i] == "--no-cache":
+            opts["cache"] = "off"
+            i += 1
+        elif args[i] == "--refresh":
+            opts["cache"] = "refresh"
             i += 1
         elif args[i] in ("-h", "--help"):
             usage()
@@ -119,21 +784,22 @@ def parse_common_opts(args):
         else:
             rest.append(args[i])
             i += 1
-    return focus, dry_run, rest
+    return opts, rest
 
 
 def handle_uncommitted(args):
-    focus, dry_run, rest = parse_common_opts(args)
+    opts, rest = parse_common_opts(args)
     if rest:
         fail(f"Unknown option: {rest[0]}")
-    warn_focus_ignored(focus)
-    cmd = ["codex", "exec", "review", "--uncommitted", "--json", "-c", "model=gpt-5.5", "-c", 'model_reasoning_effort="xhigh"']
-    run_codex(cmd, dry_run)
+    if opts["shards"] > 1 or opts["incremental"]:
+        fail("--shards and --incremental are only supported for branch reviews")
+    warn_focus_ignored(opts["focus"])
+    run_codex(review_cmd("--uncommitted"), opts, "uncommitted")
 
 
 def handle_branch(args):
     base = "main"
-    focus, dry_run, rest = parse_common_opts(args)
+    opts, rest = parse_common_opts(args)
     # Extract --base from rest
     filtered = []
     i = 0
@@ -148,21 +814,30 @@ def handle_branch(args):
             i += 1
     if filtered:
         fail(f"Unknown option: {filtered[0]}")
-    warn_focus_ignored(focus)
-    cmd = ["codex", "exec", "review", "--base", base, "--json", "-c", "model=gpt-5.5", "-c", 'model_reasoning_effort="xhigh"']
-    run_codex(cmd, dry_run)
+    if opts["incremental"]:
+        if opts["shards"] > 1:
+            fail("--incremental cannot be combined with --shards")
+        warn_focus_ignored(opts["focus"])
+        run_incremental(base, opts)
+        return
+    if opts["shards"] > 1:
+        run_sharded(base, opts)
+        return
+    warn_focus_ignored(opts["focus"])
+    run_codex(review_cmd("--base", base), opts, "branch", base)
 
 
 def handle_commit(args):
     if not args:
         fail("Usage: codex-review.py commit <SHA> [options]")
     sha = args[0]
-    focus, dry_run, rest = parse_common_opts(args[1:])
+    opts, rest = parse_common_opts(args[1:])
     if rest:
         fail(f"Unknown option: {rest[0]}")
-    warn_focus_ignored(focus)
-    cmd = ["codex", "exec", "review", "--commit", sha, "--json", "-c", "model=gpt-5.5", "-c", 'model_reasoning_effort="xhigh"']
-    run_codex(cmd, dry_run)
+    if opts["shards"] > 1 or opts["incremental"]:
+        fail("--shards and --incremental are only supported for branch reviews")
+    warn_focus_ignored(opts["focus"])
+    run_codex(review_cmd("--commit", sha), opts, "commit", sha)
 
 
 def main():
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compare full-document parsing against incremental default-version scanning.
+
+Usage:
+    python3 bench_parse.py [--versions 1000,10000,100000] [--default-at end|middle|start|none]
+
+For each version count, writes a synthetic deps.dev package document to a temp
+file and parses it in a fresh child process with both strategies:
+
+    full     response.read() + json.loads + pick_version (the pre-streaming path)
+    stream   scan_default_version over 64 KiB reads
+
+Each child reports wall time and peak RSS growth (ru_maxrss after parsing
+minus before), so the numbers are not polluted by the other strategy's heap.
+
+Output: TSV with columns: versions, payload, strategy, seconds, peak_rss_delta
+"""
+
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "get-versions.py")
+
+
+def fail(msg):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def load_get_versions():
+    spec = importlib.util.spec_from_file_location("get_versions", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def max_rss_bytes():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def human(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def write_document(path, count, default_at):
+    default_index = {"end": count - 1, "middle": count // 2, "start": 0, "none": -1}[default_at]
+    with open(path, "w") as f:
+        f.write('{"packageKey":{"system":"NPM","name":"@types/node"},"versions":[')
+        for i in range(count):
+            if i:
+                f.write(",")
+            json.dump(
+                {
+                    "versionKey": {"system": "NPM", "name": "@types/node", "version": f"{i // 100}.{i % 100}.0"},
+                    "publishedAt": "2024-01-19T00:00:00Z",
+                    "isDefault": i == default_index,
+                    "isDeprecated": False,
+                },
+                f,
+            )
+        f.write("]}")
+
+
+def child(strategy, path):
+    gv = load_get_versions()
+    before = max_rss_bytes()
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        if strategy == "full":
+            row = gv.pick_version("@types/node", json.loads(f.read().decode("utf-8")))
+        else:
+            row = gv.version_row("@types/node", gv.scan_default_version(f.read))
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"seconds": elapsed, "rss_delta": max_rss_bytes() - before, "version": row["version"]}))
+
+
+def parse_args(args):
+    counts = [1000, 10000, 100000]
+    default_at = "end"
+    i = 0
+    while i < len(args):
+        if args[i] == "--versions":
+            if i + 1 >= len(args):
+                fail("--versions requires a value")
+            try:
+                counts = [int(n) for n in args[i + 1].split(",")]
+            except ValueError:
+                fail(f"--versions must be comma-separated integers, got '{args[i + 1]}'")
+            i += 2
+        elif args[i] == "--default-at":
+            if i + 1 >= len(args):
+                fail("--default-at requires a value")
+            if args[i + 1] not in ("end", "middle", "start", "none"):
+                fail("--default-at must be one of: end, middle, start, none")
+            default_at = args[i + 1]
+            i += 2
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        else:
+            fail(f"Unknown option: {args[i]}")
+    return counts, default_at
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+        return
+
+    counts, default_at = parse_args(sys.argv[1:])
+
+    print("versions\tpayload\tstrategy\tseconds\tpeak_rss_delta")
+    with tempfile.TemporaryDirectory(prefix="godfetch-bench-") as tmp:
+        for count in counts:
+            path = os.path.join(tmp, f"{count}.json")
+            write_document(path, count, default_at)
+            payload = human(os.path.getsize(path))
+            versions = set()
+            for strategy in ("full", "stream"):
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", strategy, path],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                result = json.loads(out)
+                versions.add(result["version"])
+                print(f"{count}\t{payload}\t{strategy}\t{result['seconds']:.4f}\t{human(result['rss_delta'])}")
+            if len(versions) != 1:
+                fail(f"strategies disagree on the default version for {count} versions: {versions}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Load-test get-versions.py against a local fake deps.dev server.
+
+Usage:
+    python3 bench_versions.py [options] [-- fake server options]
+    python3 bench_versions.py --packages 100,500 --workers 5,10,20,50
+    python3 bench_versions.py --workers 10,40 -- --rps 200 --hang-rate 0.01 --hang 5
+
+Starts fake_depsdev.py in a child process (so the server does not share the
+benchmark's GIL), then resolves N distinct packages through get-versions.py's
+own pooled engine (iter_resolved, cache disabled) for every combination of
+package count and worker count. Everything after "--" is passed to the fake
+server: --latency, --jitter, --versions, --rps, --error-rate, --hang-rate,
+--hang (see fake_depsdev.py --help).
+
+Options:
+    --packages <n,...>      Package counts to resolve (default: 50,200,500)
+    --workers <n,...>       Worker counts to try (default: 1,5,10,20,50)
+    --timeout <seconds>     Per-package deadline passed to the client
+                            (default: 10)
+    --missing <fraction>    Share of packages that should 404 (default: 0)
+
+Output: TSV, one row per run, with columns:
+    packages, workers, seconds, pkg_per_s, p50_ms, p95_ms, p99_ms,
+    ok, not_found, errors, http_429, connections
+followed by "# best" lines naming the worker count with the highest goodput
+(packages resolved without error per second) for each package count.
+Latencies are per package, including retries.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, "..", "scripts", "get-versions.py")
+FAKE_SERVER = os.path.join(HERE, "fake_depsdev.py")
+
+
+def fail(msg):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def load_get_versions():
+    spec = importlib.util.spec_from_file_location("get_versions", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def start_fake_server(server_args):
+    proc = subprocess.Popen(
+        [sys.executable, FAKE_SERVER, *server_args],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stdout.readline().split()
+    if len(line) != 2 or line[0] != "listening":
+        proc.kill()
+        fail("fake server did not start")
+    return proc, int(line[1])
+
+
+def server_stats(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/__stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def run_once(gv, packages, workers, deadline):
+    """Resolve packages once; return (wall seconds, [(latency, status), ...])."""
+    timings = []
+    original = gv.get_latest_version
+
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        row = original(*args, **kwargs)
+        timings.append((time.perf_counter() - started, row["status"]))
+        return row
+
+    opts = {"use_cache": False, "offline": False, "max_age": 0, "workers": workers, "deadline": deadline}
+    gv.get_latest_version = timed
+    try:
+        started = time.perf_counter()
+        for _ in gv.iter_resolved([("NPM", pkg) for pkg in packages], opts):
+            pass
+        return time.perf_counter() - started, timings
+    finally:
+        gv.get_latest_version = original
+
+
+def parse_list(flag, value):
+    try:
+        numbers = [int(n) for n in value.split(",")]
+    except ValueError:
+        fail(f"{flag} must be comma-separated integers, got '{value}'")
+    if any(n < 1 for n in numbers):
+        fail(f"{flag} values must be positive")
+    return numbers
+
+
+def parse_args(args):
+    package_counts = [50, 200, 500]
+    worker_counts = [1, 5, 10, 20, 50]
+    deadline = 10.0
+    missing = 0.0
+    server_args = []
+    i = 0
+    while i < len(args):
+        if args[i] == "--":
+            server_args = args[i + 1:]
+            break
+        if args[i] in ("--packages", "--workers", "--timeout", "--missing"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            if args[i] == "--packages":
+                package_counts = parse_list(args[i], args[i + 1])
+            elif args[i] == "--workers":
+                worker_counts = parse_list(args[i], args[i + 1])
+            else:
+                try:
+                    value = float(args[i + 1])
+                except ValueError:
+                    fail(f"{args[i]} must be a number, got '{args[i + 1]}'")
+                if args[i] == "--timeout":
+                    deadline = value
+                else:
+                    missing = value
+            i += 2
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        else:
+            fail(f"Unknown option: {args[i]}")
+    return package_counts, worker_counts, deadline, missing, server_args
+
+
+def main():
+    package_counts, worker_counts, deadline, missing, server_args = parse_args(sys.argv[1:])
+
+    proc, port = start_fake_server(server_args)
+    gv = load_get_versions()
+    gv.API_BASE = f"http://127.0.0.1:{port}/v3/systems"
+
+    best = {}
+    print(
+        "packages\tworkers\tseconds\tpkg_per_s\tp50_ms\tp95_ms\tp99_ms"
+        "\tok\tnot_found\terrors\thttp_429\tconnections"
+    )
+    try:
+        for count in package_counts:
+            missing_every = round(1 / missing) if missing > 0 else 0
+            packages = [
+                f"missing-{i}" if missing_every and i % missing_every == 0 else f"pkg-{i}"
+                for i in range(count)
+            ]
+            for workers in worker_counts:
+                before = server_stats(port)
+                seconds, timings = run_once(gv, packages, workers, deadline)
+                after = server_stats(port)
+
+                latencies = sorted(t * 1000 for t, _ in timings)
+                statuses = [status for _, status in timings]
+                errors = sum(1 for status in statuses if status.startswith("error"))
+                not_found = statuses.count("not found")
+                throughput = count / seconds if seconds else 0.0
+                print(
+                    f"{count}\t{workers}\t{seconds:.3f}\t{throughput:.1f}"
+                    f"\t{percentile(latencies, 50):.1f}\t{percentile(latencies, 95):.1f}"
+                    f"\t{percentile(latencies, 99):.1f}"
+                    f"\t{count - errors - not_found}\t{not_found}\t{errors}"
+                    f"\t{after.get('429', 0) - before.get('429', 0)}"
+                    f"\t{after.get('connections', 0) - before.get('connections', 0)}",
+                    flush=True,
+                )
+                goodput = (count - errors) / seconds if seconds else 0.0
+                if goodput > best.get(count, (0, 0.0))[1]:
+                    best[count] = (workers, goodput)
+    finally:
+        proc.kill()
+        proc.wait()
+
+    for count in package_counts:
+        workers, goodput = best.get(count, (0, 0.0))
+        print(f"# best for {count} packages: {workers} workers ({goodput:.1f} resolved pkg/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the deps.dev package endpoint, with fault injection.
+
+Usage:
+    python3 fake_depsdev.py [options]
+
+Serves GET /v3/systems/{system}/packages/{name} over HTTP/1.1 keep-alive and
+prints "listening <port>" on stdout once ready. Point get-versions.py at it
+with DEPS_DEV_API_BASE=http://127.0.0.1:<port>/v3/systems.
+
+Options:
+    --port <n>              Port to bind on 127.0.0.1 (default: 0 = any free)
+    --latency <seconds>     Base service time per request (default: 0.05)
+    --jitter <seconds>      Uniform extra latency, 0..jitter (default: 0.02)
+    --versions <n>          Version entries per package document (default: 200)
+    --rps <n>               Token-bucket rate limit; excess requests get 429
+                            with Retry-After (default: 0 = unlimited)
+    --error-rate <p>        Probability of a random 429 (default: 0)
+    --hang-rate <p>         Probability of stalling --hang seconds before
+                            answering, to trip client deadlines (default: 0)
+    --hang <seconds>        Stall duration for --hang-rate (default: 30)
+
+Behavior:
+    - Package names starting with "missing" answer 404.
+    - Responses carry an ETag; a matching If-None-Match answers 304.
+    - GET /__stats returns request/status counters as JSON.
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+
+def fail(msg):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+class TokenBucket:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Return 0 if a token was taken, else seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+def package_document(system, name, versions):
+    return json.dumps(
+        {
+            "packageKey": {"system": system, "name": name},
+            "versions": [
+                {
+                    "versionKey": {"system": system, "name": name, "version": f"1.{i}.0"},
+                    "publishedAt": "2024-01-19T00:00:00Z",
+                    "isDefault": i == versions - 1,
+                    "isDeprecated": False,
+                }
+                for i in range(versions)
+            ],
+        }
+    ).encode()
+
+
+def make_handler(config, stats):
+    bucket = TokenBucket(config["rps"]) if config["rps"] else None
+    stats_lock = threading.Lock()
+    documents = {}
+
+    def count(key):
+        with stats_lock:
+            stats[key] = stats.get(key, 0) + 1
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            count("connections")
+
+        def reply(self, status, body=b"", headers=None):
+            count(str(status))
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/__stats":
+                with stats_lock:
+                    body = json.dumps(stats).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            count("requests")
+            parts = self.path.split("/")
+            # ['', 'v3', 'systems', system, 'packages', name]
+            if len(parts) != 6 or parts[1:3] != ["v3", "systems"] or parts[4] != "packages":
+                self.reply(400)
+                return
+            system, name = parts[3], unquote(parts[5])
+
+            if bucket:
+                wait = bucket.take()
+                if wait:
+                    self.reply(429, headers={"Retry-After": f"{wait:.3f}"})
+                    return
+            if random.random() < config["error_rate"]:
+                self.reply(429, headers={"Retry-After": "0.1"})
+                return
+            if random.random() < config["hang_rate"]:
+                count("hangs")
+                time.sleep(config["hang"])
+
+            time.sleep(config["latency"] + random.random() * config["jitter"])
+
+            if name.startswith("missing"):
+                self.reply(404)
+                return
+            etag = f'"{system}-{name}-{config["versions"]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.reply(304, headers={"ETag": etag})
+                return
+            body = documents.get((system, name))
+            if body is None:
+                body = documents[(system, name)] = package_document(system, name, config["versions"])
+            self.reply(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that hit their deadline hang up mid-response; that is the point
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def start_server(config, port=0):
+    """Start the fake server on a background thread; returns (server, stats)."""
+    stats = {}
+    server = QuietServer(("127.0.0.1", port), make_handler(config, stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def parse_args(args):
+    config = {
+        "latency": 0.05,
+        "jitter": 0.02,
+        "versions": 200,
+        "rps": 0.0,
+        "error_rate": 0.0,
+        "hang_rate": 0.0,
+        "hang": 30.0,
+    }
+    port = 0
+    flags = {
+        "--latency": "latency",
+        "--jitter": "jitter",
+        "--rps": "rps",
+        "--error-rate": "error_rate",
+        "--hang-rate": "hang_rate",
+        "--hang": "hang",
+    }
+    i = 0
+    while i < len(args):
+        if args[i] in flags or args[i] in ("--port", "--versions"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            try:
+                if args[i] == "--port":
+                    port = int(args[i + 1])
+                elif args[i] == "--versions":
+                    config["versions"] = max(1, int(args[i + 1]))
+                else:
+                    config[flags[args[i]]] = float(args[i + 1])
+            except ValueError:
+                fail(f"{args[i]} must be a number, got '{args[i + 1]}'")
+            i += 2
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        else:
+            fail(f"Unknown option: {args[i]}")
+    return config, port
+
+
+def main():
+    config, port = parse_args(sys.argv[1:])
+    server, _ = start_server(config, port)
+    print(f"listening {server.server_port}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,97 +3,1217 @@
 Get latest versions of packages from deps.dev API.
 
 Usage:
-    python3 get-versions.py <system> <package1> [package2] ...
+    python3 get-versions.py [options] <system> <package1> [package2] ...
     python3 get-versions.py npm express lodash @types/node
     python3 get-versions.py pypi requests django flask
     python3 get-versions.py go github.com/gin-gonic/gin
+    python3 get-versions.py --scan <repo-root>
 
-Supported systems: npm, pypi, go, cargo, maven, nuget
+Supported systems: npm, pypi, go, cargo, maven, nuget, rubygems
+
+Options:
+    --max-age <seconds>     Serve cached results younger than this without a
+                            network round trip (default: 21600 = 6h). Older
+                            entries are revalidated with a conditional request.
+    --offline               Answer from the cache only, regardless of age.
+                            Uncached packages report status "not cached".
+    --no-cache              Bypass the cache entirely (no reads, no writes)
+    --workers <n>           Concurrent lookups, one keep-alive connection each
+                            (default: 10)
+    --timeout <seconds>     Per-package deadline including 429/5xx retries
+                            (default: 30)
+    --scan <root>           Find manifests under <root> and report installed
+                            vs latest for every dependency (see below)
+    --format <tsv|ndjson>   Output format (default: tsv)
+    --stream                Print each row as soon as it resolves (completion
+                            order), then a summary line on stderr, e.g.
+                            "# 42 packages (1 error, 41 ok) in 1.84s"
+    --ordered               Like --stream, but rows keep input order; each row
+                            is flushed as soon as every row before it is done
+    --no-daemon             Resolve in this process even if a daemon is running
+
+Daemon:
+    --serve                 Run a long-lived lookup daemon on a Unix socket
+                            (~/.cache/godfetch/versions.sock, or
+                            $GODFETCH_SOCKET). --workers/--timeout apply to it.
+    --lru-size <n>          Daemon in-memory LRU entries (default: 4096)
+    --idle <seconds>        Daemon exits after this long without requests
+                            (default: 1800; 0 = never)
+    --stop                  Ask a running daemon to shut down
+
+    While a daemon is running, every invocation is a thin client: it forwards
+    its lookups over the socket and prints the streamed answers, so repeat
+    queries skip TLS setup and SQLite entirely. Without a daemon (or if it
+    fails mid-request) lookups are resolved in-process as usual. A client's
+    --timeout and --workers are forwarded and apply to its own lookups;
+    --workers cannot raise concurrency above the daemon's --workers.
+
+Cache:
+    SQLite database at ~/.cache/godfetch/versions.sqlite3 (honors
+    XDG_CACHE_HOME), keyed by (system, package). Stores the ETag and
+    Last-Modified headers so stale entries cost a 304, not a full download.
+    On network errors a stale entry is served instead of an error row.
+
+Network:
+    Connections to api.deps.dev are HTTP/1.1 keep-alive and reused by each
+    worker, so a run pays one TLS handshake per worker, not per package.
+    429/502/503/504 responses are retried after Retry-After (or exponential
+    backoff with jitter) until the per-package deadline. Set
+    DEPS_DEV_API_BASE to point the script at a mirror or a local stand-in
+    (see godfetch/bench/).
+
+Scan mode:
+    Walks <root> (skipping node_modules, vendor, target, build output and
+    dot-directories) for package.json, requirements*.txt, pyproject.toml,
+    Cargo.toml, go.mod, *.csproj and pom.xml. Dependencies are deduped by
+    (system, package) across every workspace and resolved in one pooled run.
+    Packages the workspace itself provides are skipped. "installed" is the
+    version pinned by package-lock.json, Cargo.lock, poetry.lock or uv.lock
+    when present, otherwise the declared spec; several distinct values are
+    comma-separated.
 
 Output: TSV with columns: package, version, published, status
+        (--scan: system, package, installed, latest, published, status)
+        --format ndjson prints one JSON object per row with the same keys.
 """
 
+import codecs
+import collections
 import json
+import os
+import random
+import re
+import socket
+import socketserver
+import sqlite3
 import sys
+import threading
+import time
 import urllib.parse
-import urllib.request
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 
 
-API_BASE = "https://api.deps.dev/v3/systems"
+API_BASE = os.environ.get("DEPS_DEV_API_BASE", "https://api.deps.dev/v3/systems")
 
+CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "godfetch",
+    "versions.sqlite3",
+)
+PACKAGE_FIELDS = ("package", "version", "published", "status")
+SCAN_FIELDS = ("system", "package", "installed", "latest", "published", "status")
+
+DEFAULT_MAX_AGE = 6 * 3600
+DEFAULT_WORKERS = 10
+DEFAULT_DEADLINE = 30.0
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+READ_CHUNK = 64 * 1024
+DRAIN_LIMIT = 256 * 1024
+
+DEFAULT_LRU_SIZE = 4096
+DEFAULT_IDLE = 1800.0
+DAEMON_PROTOCOL = 1
+DAEMON_CONNECT_TIMEOUT = 0.5
+
+VERSIONS_KEY_RE = re.compile(r'"versions"\s*:\s*\[')
+
+
+def fail(msg):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+class VersionCache:
+    """On-disk cache of resolved rows, keyed by (system, package)."""
+
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS versions (
+                system TEXT NOT NULL,
+                package TEXT NOT NULL,
+                row TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (system, package)
+            )"""
+        )
+        self._db.commit()
+
+    def get(self, system, package):
+        with self._lock:
+            found = self._db.execute(
+                "SELECT row, etag, last_modified, fetched_at FROM versions"
+                " WHERE system = ? AND package = ?",
+                (system, package),
+            ).fetchone()
+        if not found:
+            return None
+        row, etag, last_modified, fetched_at = found
+        return {
+            "row": json.loads(row),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at,
+        }
+
+    def put(self, system, package, row, etag=None, last_modified=None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?)",
+                (system, package, json.dumps(row), etag, last_modified, time.time()),
+            )
+            self._db.commit()
+
+    def touch(self, system, package):
+        """Mark an entry as freshly revalidated (server answered 304)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE versions SET fetched_at = ? WHERE system = ? AND package = ?",
+                (time.time(), system, package),
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class FetchError(Exception):
+    pass
 
-def get_latest_version(system: str, package: str) -> dict:
-    """Fetch the latest version of a package from deps.dev API."""
-    encoded_name = urllib.parse.quote(package, safe="")
-    url = f"{API_BASE}/{system}/packages/{encoded_name}"
 
+def retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
     try:
-        with urllib.request.urlopen(url, timeout=10) as response:
-            data = json.loads(response.read().decode("utf-8"))
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import email.utils  # slow import; only needed for HTTP-date values
+
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class DepsDevClient:
+    """HTTP/1.1 client that keeps one persistent connection per worker thread.
+
+    Each package lookup reuses the calling thread's connection, so a run pays
+    one TLS handshake per worker instead of one per package. 429 and 5xx
+    gateway responses are retried after Retry-After (or exponential backoff)
+    until `deadline`; connection errors are retried up to `max_retries` times.
+    No lookup runs longer than `deadline` seconds including retries.
+    """
+
+    RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(self, base=None, deadline=DEFAULT_DEADLINE, max_retries=5):
+        # Imported here so daemon clients, which never fetch, skip its ~50ms import
+        import http.client
+
+        self.http = http.client
+        parts = urllib.parse.urlsplit(base or API_BASE)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _connection(self, timeout):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.scheme == "https":
+                conn = self.http.HTTPSConnection(self.host, self.port, timeout=timeout)
+            else:
+                conn = self.http.HTTPConnection(self.host, self.port, timeout=timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+
+    def _finish(self, response):
+        """Leave the connection reusable after a consumer stopped reading early.
+
+        A short remainder is drained so the keep-alive connection survives; a
+        long (or chunked) one is cheaper to abandon than to download.
+        """
+        if response.isclosed():
+            return
+        if response.length is not None and response.length <= DRAIN_LIMIT:
+            while response.read(READ_CHUNK):
+                pass
+        else:
+            self._drop_connection()
+
+    def get(self, path, headers=None, consume=None, deadline=None):
+        """GET prefix+path; return (status, headers, body). Raises FetchError.
+
+        For 200 responses, `consume(response)` (when given) reads the body
+        incrementally and its return value replaces the raw bytes. `deadline`
+        overrides the client's deadline for this request.
+        """
+        deadline_at = time.monotonic() + (self.deadline if deadline is None else deadline)
+        request_headers = {"Accept": "application/json", "Connection": "keep-alive"}
+        request_headers.update(headers or {})
+        attempt = 0
+        backoffs = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise FetchError("deadline exceeded")
+            conn = self._connection(remaining)
+            try:
+                conn.request("GET", self.prefix + path, headers=request_headers)
+                response = conn.getresponse()
+                if consume and response.status == 200:
+                    body = consume(response)
+                    self._finish(response)
+                else:
+                    body = response.read()
+            except (self.http.HTTPException, OSError) as e:
+                # A keep-alive connection the server already closed fails on
+                # first use; reconnect and retry within the deadline.
+                self._drop_connection()
+                attempt += 1
+                if attempt > self.max_retries or time.monotonic() >= deadline_at:
+                    if isinstance(e, TimeoutError):
+                        raise FetchError("deadline exceeded") from e
+                    raise FetchError(str(e) or type(e).__name__) from e
+                continue
+            except Exception:
+                self._drop_connection()
+                raise
+            if response.will_close:
+                self._drop_connection()
+
+            # Status retries are bounded by the deadline alone: under a rate
+            # limit, a fixed retry count gives up while Retry-After is still
+            # short enough to succeed.
+            if response.status not in self.RETRY_STATUSES:
+                return response.status, response.headers, body
+
+            delay = retry_after_seconds(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** backoffs) * (0.5 + random.random() / 2)
+            if time.monotonic() + delay >= deadline_at:
+                return response.status, response.headers, body
+            backoffs += 1
+            time.sleep(delay)
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def error_row(package, status):
+    return {"package": package, "version": "-", "published": "-", "status": status}
+
+
+def version_row(package, chosen):
+    if chosen is None:
+        return error_row(package, "not found")
+    return {
+        "package": package,
+        "version": chosen["versionKey"]["version"],
+        "published": chosen.get("publishedAt", "")[:10],
+        "status": "deprecated" if chosen.get("isDeprecated") else "ok",
+    }
+
+
+def pick_version(package, data):
+    """Reduce a fully parsed deps.dev package document to one output row."""
+    versions = data.get("versions", [])
+    chosen = next((v for v in versions if v.get("isDefault")), None)
+    if chosen is None and versions:
+        # No default version found, use the last one
+        chosen = versions[-1]
+    return version_row(package, chosen)
 
-        for version in data.get("versions", []):
+
+def scan_default_version(read, chunk_size=READ_CHUNK):
+    """Find the default version in a deps.dev document without loading it.
+
+    `read(n)` returns the next bytes of the body (b"" at EOF). Version objects
+    are decoded one at a time from a sliding buffer and dropped once seen, so
+    peak memory is one chunk plus one version entry however long the history
+    is. Stops reading at the first `isDefault` entry; without one, returns
+    the last entry (same fallback as pick_version), or None if there are none.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf = ""
+    pos = 0
+    eof = False
+    in_versions = False
+    last = None
+
+    while True:
+        if not in_versions:
+            m = VERSIONS_KEY_RE.search(buf)
+            if m:
+                in_versions = True
+                pos = m.end()
+            else:
+                # Keep a tail in case the key straddles two chunks
+                buf = buf[-32:]
+        while in_versions:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                return last
+            try:
+                version, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError("truncated deps.dev response")
+                break  # entry continues in the next chunk
             if version.get("isDefault"):
-                return {
-                    "package": package,
-                    "version": version["versionKey"]["version"],
-                    "published": version.get("publishedAt", "")[:10],
-                    "status": "deprecated" if version.get("isDeprecated") else "ok",
-                }
-
-        # No default version found, return the last one
-        versions = data.get("versions", [])
-        if versions:
-            last = versions[-1]
-            return {
-                "package": package,
-                "version": last["versionKey"]["version"],
-                "published": last.get("publishedAt", "")[:10],
-                "status": "deprecated" if last.get("isDeprecated") else "ok",
-            }
+                return version
+            last = version
+            pos = end
+        if eof:
+            return last
+
+        buf = buf[pos:]
+        pos = 0
+        chunk = read(chunk_size)
+        eof = not chunk
+        buf += text.decode(chunk, final=eof)
+
+
+def get_latest_version(
+    system, package, client, cache=None, max_age=DEFAULT_MAX_AGE, offline=False, deadline=None
+):
+    """Fetch the latest version of a package from deps.dev API.
+
+    With a cache, fresh entries are returned without touching the network and
+    stale ones are revalidated via If-None-Match / If-Modified-Since.
+    """
+    cached = cache.get(system, package) if cache else None
+    if cached and (offline or time.time() - cached["fetched_at"] <= max_age):
+        return cached["row"]
+    if offline:
+        return error_row(package, "not cached")
+
+    encoded_name = urllib.parse.quote(package, safe="")
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        status, response_headers, body = client.get(
+            f"/{system}/packages/{encoded_name}",
+            headers,
+            consume=lambda response: scan_default_version(response.read),
+            deadline=deadline,
+        )
+
+        if status == 304 and cached:
+            cache.touch(system, package)
+            return cached["row"]
+        if status == 404:
+            row = error_row(package, "not found")
+            if cache:
+                cache.put(system, package, row)
+            return row
+        if status != 200:
+            raise FetchError(f"HTTP {status}")
 
-        return {"package": package, "version": "-", "published": "-", "status": "not found"}
+        row = version_row(package, body)
+        if cache:
+            cache.put(system, package, row, response_headers.get("ETag"), response_headers.get("Last-Modified"))
+        return row
 
-    except urllib.error.HTTPError as e:
-        return {"package": package, "version": "-", "published": "-", "status": f"error: HTTP {e.code}"}
-    except urllib.error.URLError as e:
-        return {"package": package, "version": "-", "published": "-", "status": f"error: {e.reason}"}
     except Exception as e:
-        return {"package": package, "version": "-", "published": "-", "status": f"error: {e}"}
+        if cached:
+            return cached["row"]
+        return error_row(package, f"error: {e}")
 
 
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: get-versions.py <system> <package1> [package2] ...")
-        print("Systems: npm, pypi, go, cargo, maven, nuget")
-        sys.exit(1)
+# --- Manifest scanning ------------------------------------------------------
 
-    system = sys.argv[1].upper()
-    packages = sys.argv[2:]
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "bower_components", "vendor", "target",
+    "dist", "build", "out", "bin", "obj", ".next", ".turbo", ".venv", "venv",
+    "__pycache__", ".tox", ".nox", ".mypy_cache", ".gradle",
+}
 
-    valid_systems = ["NPM", "PYPI", "GO", "CARGO", "MAVEN", "NUGET", "RUBYGEMS"]
-    if system not in valid_systems:
-        print(f"Error: Invalid system '{sys.argv[1]}'. Use: {', '.join(s.lower() for s in valid_systems)}")
-        sys.exit(1)
+NPM_DEP_FIELDS = ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies")
+NPM_LOCAL_SPECS = ("workspace:", "file:", "link:", "portal:", "git", "http:", "https:", "github:")
+CARGO_DEP_TABLES = ("dependencies", "dev-dependencies", "build-dependencies")
+
+PEP508_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(\(?[^;@]*\)?)")
+GO_REQUIRE_RE = re.compile(r"^\s*([^\s()]+)\s+(v[^\s]+)(\s*//\s*indirect)?")
+MAVEN_PROPERTY_RE = re.compile(r"\$\{([^}]+)\}")
+
+
+def normalize_pypi(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def pep508_dep(requirement):
+    """Split a PEP 508 requirement into (name, spec); None for URLs/options."""
+    requirement = requirement.split("#", 1)[0].strip()
+    if not requirement or requirement.startswith(("-", ".", "/")) or "://" in requirement:
+        return None
+    m = PEP508_RE.match(requirement)
+    if not m:
+        return None
+    spec = m.group(3).strip().strip("()").strip()
+    return normalize_pypi(m.group(1)), spec or "*"
+
+
+def load_toml(path):
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        print(f"Warning: skipping {path} — TOML parsing needs Python 3.11+", file=sys.stderr)
+        return {}
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def parse_package_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("top-level value is not an object")
+    # version None marks a package the workspace itself provides
+    deps = [("NPM", data["name"], None)] if isinstance(data.get("name"), str) and data["name"] else []
+    for field in NPM_DEP_FIELDS:
+        table = data.get(field)
+        if not isinstance(table, dict):
+            continue
+        for name, spec in table.items():
+            if isinstance(spec, str) and not spec.startswith(NPM_LOCAL_SPECS):
+                deps.append(("NPM", name, spec))
+    return deps
+
+
+def parse_requirements(path):
+    deps = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            dep = pep508_dep(line)
+            if dep:
+                deps.append(("PYPI", *dep))
+    return deps
+
+
+def parse_pyproject(path):
+    data = load_toml(path)
+    requirements = list(data.get("project", {}).get("dependencies", []))
+    for group in data.get("project", {}).get("optional-dependencies", {}).values():
+        requirements.extend(group)
+    for group in data.get("dependency-groups", {}).values():
+        requirements.extend(r for r in group if isinstance(r, str))
+    deps = [("PYPI", *dep) for dep in map(pep508_dep, requirements) if dep]
+    own_name = data.get("project", {}).get("name") or data.get("tool", {}).get("poetry", {}).get("name")
+    if own_name:
+        deps.append(("PYPI", normalize_pypi(own_name), None))
+
+    poetry = data.get("tool", {}).get("poetry", {})
+    tables = [poetry.get("dependencies", {}), poetry.get("dev-dependencies", {})]
+    tables += [g.get("dependencies", {}) for g in poetry.get("group", {}).values()]
+    for table in tables:
+        for name, spec in table.items():
+            if name.lower() == "python":
+                continue
+            if isinstance(spec, dict):
+                spec = spec.get("version")
+            if isinstance(spec, str):
+                deps.append(("PYPI", normalize_pypi(name), spec))
+    return deps
+
+
+def parse_cargo_toml(path):
+    data = load_toml(path)
+    tables = [data.get(t, {}) for t in CARGO_DEP_TABLES]
+    tables.append(data.get("workspace", {}).get("dependencies", {}))
+    for target in data.get("target", {}).values():
+        tables.extend(target.get(t, {}) for t in CARGO_DEP_TABLES)
+    own_name = data.get("package", {}).get("name")
+    deps = [("CARGO", own_name, None)] if own_name else []
+    for table in tables:
+        for name, spec in table.items():
+            if isinstance(spec, dict):
+                if "path" in spec or "git" in spec or spec.get("workspace"):
+                    continue
+                name = spec.get("package", name)
+                spec = spec.get("version", "*")
+            if isinstance(spec, str):
+                deps.append(("CARGO", name, spec))
+    return deps
+
+
+def parse_go_mod(path):
+    deps = []
+    in_block = False
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.startswith("module "):
+                deps.append(("GO", stripped.split()[1], None))
+                continue
+            if stripped.startswith("require ("):
+                in_block = True
+                continue
+            if in_block and stripped.startswith(")"):
+                in_block = False
+                continue
+            if stripped.startswith("require "):
+                stripped = stripped[len("require "):]
+            elif not in_block:
+                continue
+            m = GO_REQUIRE_RE.match(stripped)
+            if m and not m.group(3):
+                deps.append(("GO", m.group(1), m.group(2)))
+    return deps
+
+
+def xml_children(element, tag):
+    """Namespace-agnostic findall for direct children."""
+    return [child for child in element if child.tag.rsplit("}", 1)[-1] == tag]
+
+
+def xml_text(element, tag):
+    found = xml_children(element, tag)
+    return (found[0].text or "").strip() if found else ""
+
+
+def parse_csproj(path):
+    from xml.etree import ElementTree
+
+    deps = []
+    for ref in ElementTree.parse(path).getroot().iter():
+        if ref.tag.rsplit("}", 1)[-1] != "PackageReference":
+            continue
+        name = ref.get("Include") or ref.get("Update")
+        version = ref.get("Version") or xml_text(ref, "Version") or "*"
+        if name:
+            deps.append(("NUGET", name, version))
+    return deps
+
+
+def parse_pom(path):
+    from xml.etree import ElementTree
 
-    # Fetch versions in parallel
-    results = []
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    root = ElementTree.parse(path).getroot()
+    properties = {}
+    for props in xml_children(root, "properties"):
+        for prop in props:
+            properties[prop.tag.rsplit("}", 1)[-1]] = (prop.text or "").strip()
+    properties["project.version"] = xml_text(root, "version")
+
+    def resolve(value):
+        return MAVEN_PROPERTY_RE.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+
+    deps = []
+    for dep in root.iter():
+        if dep.tag.rsplit("}", 1)[-1] != "dependency":
+            continue
+        group = resolve(xml_text(dep, "groupId"))
+        artifact = resolve(xml_text(dep, "artifactId"))
+        if not group or not artifact or "${" in group + artifact:
+            continue
+        deps.append(("MAVEN", f"{group}:{artifact}", resolve(xml_text(dep, "version")) or "*"))
+    return deps
+
+
+def parse_package_lock(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("top-level value is not an object")
+    packages = data.get("packages")
+    locked = []
+    for key, meta in (packages if isinstance(packages, dict) else {}).items():
+        # Only hoisted top-level installs; nested node_modules are transitive
+        name = key[len("node_modules/"):] if key.startswith("node_modules/") else ""
+        if not isinstance(meta, dict) or not isinstance(meta.get("version"), str):
+            continue
+        if name and "/node_modules/" not in name and meta["version"]:
+            locked.append(("NPM", name, meta["version"]))
+    return locked
+
+
+def parse_toml_lock(system):
+    def parse(path):
+        locked = []
+        for package in load_toml(path).get("package", []):
+            name, version = package.get("name"), package.get("version")
+            if name and version:
+                locked.append((system, normalize_pypi(name) if system == "PYPI" else name, version))
+        return locked
+
+    return parse
+
+
+MANIFEST_PARSERS = [
+    (lambda f: f == "package.json", parse_package_json),
+    (lambda f: f.startswith("requirements") and f.endswith(".txt"), parse_requirements),
+    (lambda f: f == "pyproject.toml", parse_pyproject),
+    (lambda f: f == "Cargo.toml", parse_cargo_toml),
+    (lambda f: f == "go.mod", parse_go_mod),
+    (lambda f: f.endswith(".csproj"), parse_csproj),
+    (lambda f: f == "pom.xml", parse_pom),
+]
+
+LOCKFILE_PARSERS = {
+    "package-lock.json": parse_package_lock,
+    "Cargo.lock": parse_toml_lock("CARGO"),
+    "poetry.lock": parse_toml_lock("PYPI"),
+    "uv.lock": parse_toml_lock("PYPI"),
+}
+
+
+def scan_manifests(root):
+    """Walk a repo and collect deduped (system, package) -> installed versions.
+
+    Declared specs come from manifests; when a lockfile pins the package, the
+    resolved versions replace the declared ranges.
+    """
+    declared = {}
+    locked = {}
+    internal = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if filename in LOCKFILE_PARSERS:
+                parser, target = LOCKFILE_PARSERS[filename], locked
+            else:
+                parser = next((p for match, p in MANIFEST_PARSERS if match(filename)), None)
+                target = declared
+            if parser is None:
+                continue
+            try:
+                entries = parser(path)
+            except (OSError, ValueError, SyntaxError) as e:  # ElementTree.ParseError is a SyntaxError
+                print(f"Warning: skipping {path}: {e}", file=sys.stderr)
+                continue
+            for system, name, version in entries:
+                if version is None:
+                    internal.add((system, name))
+                else:
+                    target.setdefault((system, name), set()).add(version)
+
+    installed = {}
+    for key, specs in declared.items():
+        if key in internal:
+            continue
+        versions = locked.get(key) or specs
+        if len(versions) > 1:
+            versions = versions - {"*"}
+        installed[key] = sorted(versions)
+    return installed
+
+
+# --- Daemon -----------------------------------------------------------------
+
+class MemoryCache:
+    """In-process LRU in front of a VersionCache (same interface)."""
+
+    def __init__(self, backing, size=DEFAULT_LRU_SIZE):
+        self.backing = backing
+        self.size = size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, system, package):
+        key = (system, package)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self.backing.get(system, package)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def put(self, system, package, row, etag=None, last_modified=None):
+        self.backing.put(system, package, row, etag, last_modified)
+        self._remember(
+            (system, package),
+            {"row": row, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()},
+        )
+
+    def touch(self, system, package):
+        self.backing.touch(system, package)
+        with self._lock:
+            entry = self._entries.get((system, package))
+            if entry is not None:
+                self._entries[(system, package)] = dict(entry, fetched_at=time.time())
+
+    def close(self):
+        self.backing.close()
+
+
+class VersionDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves lookups over a Unix socket with warm connections and caches.
+
+    Protocol: the client sends one JSON line
+    {"v": 1, "lookups": [[system, package], ...], "max_age", "offline",
+    "use_cache"} plus, when the client set them, "deadline" and "workers";
+    the daemon answers one {"index", "row"} line per lookup in completion
+    order, then {"done": true}. {"v": 1, "op": "stop"} shuts it down.
+
+    "deadline" replaces the daemon's per-package deadline for that request's
+    lookups; "workers" caps how many of them are in flight at once (never
+    more than the daemon's own pool).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, opts):
+        super().__init__(path, DaemonHandler)
+        os.chmod(path, 0o600)
+        self.client = DepsDevClient(deadline=opts["deadline"])
+        self.cache = MemoryCache(VersionCache(), opts["lru_size"])
+        self.executor = ThreadPoolExecutor(max_workers=opts["workers"])
+        self.idle_timeout = opts["idle"]
+        self.last_active = time.monotonic()
+        self.active = 0
+        self._activity = threading.Lock()
+
+    def begin(self):
+        with self._activity:
+            self.active += 1
+
+    def end(self):
+        with self._activity:
+            self.active -= 1
+            self.last_active = time.monotonic()
+
+    def watch_idle(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 5))
+            with self._activity:
+                idle = not self.active and time.monotonic() - self.last_active >= self.idle_timeout
+            if idle:
+                self.shutdown()
+                return
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+        self.cache.close()
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def send(self, message):
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server
+        server.begin()
+        try:
+            line = self.rfile.readline()
+            if not line:
+                return  # liveness probe: connect and hang up
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self.send({"error": "malformed request"})
+                return
+            if request.get("v") != DAEMON_PROTOCOL:
+                self.send({"error": f"protocol mismatch, daemon speaks v{DAEMON_PROTOCOL}"})
+                return
+            if request.get("op") == "stop":
+                self.send({"done": True})
+                threading.Thread(target=server.shutdown, daemon=True).start()
+                return
+
+            cache = server.cache if request.get("use_cache", True) else None
+            max_age = request.get("max_age", DEFAULT_MAX_AGE)
+            offline = request.get("offline", False)
+            deadline = request.get("deadline")
+            lookups = list(enumerate(request.get("lookups", [])))
+            in_flight = request.get("workers") or len(lookups)
+            queued = iter(lookups)
+            futures = {}
+
+            def submit_next():
+                for i, (system, pkg) in queued:
+                    future = server.executor.submit(
+                        get_latest_version, system, pkg, server.client, cache, max_age, offline, deadline
+                    )
+                    futures[future] = i
+                    return
+
+            for _ in range(in_flight):
+                submit_next()
+            try:
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.send({"index": futures.pop(future), "row": future.result()})
+                        submit_next()
+                self.send({"done": True})
+            except OSError:
+                # Client went away; don't keep its lookups queued
+                for future in futures:
+                    future.cancel()
+        finally:
+            server.end()
+
+
+def socket_path():
+    return os.environ.get("GODFETCH_SOCKET") or os.path.join(os.path.dirname(CACHE_PATH), "versions.sock")
+
+
+def connect_daemon(path, timeout=DAEMON_CONNECT_TIMEOUT):
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def serve(opts):
+    if not hasattr(socket, "AF_UNIX"):
+        fail("--serve needs Unix domain sockets, which this platform lacks")
+    path = socket_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    existing = connect_daemon(path)
+    if existing:
+        existing.close()
+        fail(f"a daemon is already listening on {path}")
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a daemon that died
+
+    server = VersionDaemon(path, opts)
+    if server.idle_timeout:
+        threading.Thread(target=server.watch_idle, daemon=True).start()
+    print(f"get-versions daemon listening on {path}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def stop_daemon():
+    sock = connect_daemon(socket_path())
+    if sock is None:
+        fail("no daemon is running")
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps({"v": DAEMON_PROTOCOL, "op": "stop"}).encode() + b"\n")
+        stream.flush()
+        stream.readline()
+
+
+def iter_daemon(sock, lookups, opts):
+    """Yield (index, row) from a running daemon.
+
+    If the daemon refuses the request or drops the connection midway, the
+    lookups it has not answered are resolved directly instead.
+    """
+    request = {
+        "v": DAEMON_PROTOCOL,
+        "lookups": [list(lookup) for lookup in lookups],
+        "max_age": opts["max_age"],
+        "offline": opts["offline"],
+        "use_cache": opts["use_cache"],
+    }
+    request.update(opts["overrides"])
+    answered = set()
+    try:
+        with sock, sock.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            for line in stream:
+                message = json.loads(line)
+                if message.get("done") or "error" in message:
+                    break
+                answered.add(message["index"])
+                yield message["index"], message["row"]
+    except (OSError, ValueError):
+        pass
+
+    remaining = [i for i in range(len(lookups)) if i not in answered]
+    if remaining:
+        for j, row in iter_resolved([lookups[i] for i in remaining], opts):
+            yield remaining[j], row
+
+
+def parse_number(flag, value, kind=float):
+    try:
+        number = kind(value)
+    except ValueError:
+        fail(f"{flag} must be a number, got '{value}'")
+    if number < 0:
+        fail(f"{flag} must not be negative")
+    return number
+
+
+def parse_args(args):
+    opts = {
+        "max_age": DEFAULT_MAX_AGE,
+        "offline": False,
+        "use_cache": True,
+        "workers": DEFAULT_WORKERS,
+        "deadline": DEFAULT_DEADLINE,
+        "scan": None,
+        "format": "tsv",
+        "stream": False,
+        "ordered": False,
+        "use_daemon": True,
+        "serve": False,
+        "stop": False,
+        "lru_size": DEFAULT_LRU_SIZE,
+        "idle": DEFAULT_IDLE,
+        # --timeout/--workers given on the command line, forwarded to a daemon
+        "overrides": {},
+    }
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] in ("--max-age", "--workers", "--timeout", "--lru-size", "--idle"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            if args[i] == "--max-age":
+                opts["max_age"] = parse_number(args[i], args[i + 1])
+            elif args[i] == "--workers":
+                workers = max(1, parse_number(args[i], args[i + 1], int))
+                opts["workers"] = opts["overrides"]["workers"] = workers
+            elif args[i] == "--lru-size":
+                opts["lru_size"] = max(1, parse_number(args[i], args[i + 1], int))
+            elif args[i] == "--idle":
+                opts["idle"] = parse_number(args[i], args[i + 1])
+            else:
+                opts["deadline"] = opts["overrides"]["deadline"] = parse_number(args[i], args[i + 1])
+            i += 2
+        elif args[i] in ("--serve", "--stop", "--no-daemon"):
+            opts[{"--serve": "serve", "--stop": "stop", "--no-daemon": "use_daemon"}[args[i]]] = (
+                args[i] != "--no-daemon"
+            )
+            i += 1
+        elif args[i] == "--scan":
+            if i + 1 >= len(args):
+                fail("--scan requires a value")
+            opts["scan"] = args[i + 1]
+            i += 2
+        elif args[i] == "--format":
+            if i + 1 >= len(args):
+                fail("--format requires a value")
+            if args[i + 1] not in ("tsv", "ndjson"):
+                fail(f"--format must be tsv or ndjson, got '{args[i + 1]}'")
+            opts["format"] = args[i + 1]
+            i += 2
+        elif args[i] == "--stream":
+            opts["stream"] = True
+            i += 1
+        elif args[i] == "--ordered":
+            opts["stream"] = opts["ordered"] = True
+            i += 1
+        elif args[i] == "--offline":
+            opts["offline"] = True
+            i += 1
+        elif args[i] == "--no-cache":
+            opts["use_cache"] = False
+            i += 1
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        elif args[i].startswith("--"):
+            fail(f"Unknown option: {args[i]}")
+        else:
+            positional.append(args[i])
+            i += 1
+    if opts["offline"] and not opts["use_cache"]:
+        fail("--offline cannot be combined with --no-cache")
+    return positional, opts
+
+
+def iter_resolved(lookups, opts):
+    """Resolve (system, package) pairs in one pooled run.
+
+    Yields (index, row) as each lookup completes, in completion order.
+    """
+    cache = VersionCache() if opts["use_cache"] else None
+    client = DepsDevClient(deadline=opts["deadline"])
+
+    # Fetch versions in parallel; each worker thread keeps its own connection
+    executor = ThreadPoolExecutor(max_workers=opts["workers"])
+    try:
         futures = {
-            executor.submit(get_latest_version, system, pkg): pkg
-            for pkg in packages
+            executor.submit(
+                get_latest_version, system, pkg, client, cache, opts["max_age"], opts["offline"]
+            ): i
+            for i, (system, pkg) in enumerate(lookups)
         }
         for future in as_completed(futures):
-            results.append(future.result())
+            yield futures[future], future.result()
+    finally:
+        # A consumer that stops early (e.g. `| head`) should not wait for the rest
+        executor.shutdown(wait=True, cancel_futures=True)
+        client.close()
+        if cache:
+            cache.close()
+
+
+def in_input_order(resolved):
+    """Re-sequence (index, row) pairs, releasing each as soon as its prefix is done."""
+    pending = {}
+    next_index = 0
+    for index, row in resolved:
+        pending[index] = row
+        while next_index in pending:
+            yield next_index, pending.pop(next_index)
+            next_index += 1
+
+
+def format_row(row, fields, fmt):
+    if fmt == "ndjson":
+        return json.dumps({field: row[field] for field in fields})
+    return "\t".join(str(row[field]) for field in fields)
+
+
+def emit(rows, fields, opts):
+    """Print rows as TSV or NDJSON; returns a count of rows per status."""
+    if opts["format"] == "tsv":
+        print("\t".join(fields), flush=opts["stream"])
+    statuses = {}
+    for row in rows:
+        print(format_row(row, fields, opts["format"]), flush=opts["stream"])
+        status = "error" if row["status"].startswith("error") else row["status"]
+        statuses[status] = statuses.get(status, 0) + 1
+    return statuses
 
-    # Sort results to match input order
-    pkg_order = {pkg: i for i, pkg in enumerate(packages)}
-    results.sort(key=lambda x: pkg_order.get(x["package"], 999))
 
-    # Print TSV
-    print("package\tversion\tpublished\tstatus")
-    for r in results:
-        print(f"{r['package']}\t{r['version']}\t{r['published']}\t{r['status']}")
+def run(lookups, shape, fields, opts):
+    """Resolve lookups and print them; shape(index, row) builds the output row."""
+    started = time.monotonic()
+    sock = connect_daemon(socket_path()) if opts["use_daemon"] else None
+    resolved = iter_daemon(sock, lookups, opts) if sock else iter_resolved(lookups, opts)
+    if not opts["stream"]:
+        # Collect everything, then print in input order
+        resolved = sorted(resolved, key=lambda pair: pair[0])
+    elif opts["ordered"]:
+        resolved = in_input_order(resolved)
+
+    statuses = emit((shape(i, row) for i, row in resolved), fields, opts)
+
+    if opts["stream"]:
+        breakdown = ", ".join(f"{n} {status}" for status, n in sorted(statuses.items()))
+        print(
+            f"# {sum(statuses.values())} packages ({breakdown or 'none'}) "
+            f"in {time.monotonic() - started:.2f}s",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+def main():
+    try:
+        cli()
+    except BrokenPipeError:
+        # Downstream closed the pipe early; silence the flush at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+
+def cli():
+    positional, opts = parse_args(sys.argv[1:])
+
+    if opts["serve"] or opts["stop"]:
+        if positional or opts["scan"] is not None:
+            fail("--serve/--stop do not take lookups")
+        if opts["serve"]:
+            serve(opts)
+        else:
+            stop_daemon()
+        return
+
+    if opts["scan"] is not None:
+        if positional:
+            fail("--scan does not take <system> or package arguments")
+        if not os.path.isdir(opts["scan"]):
+            fail(f"--scan root is not a directory: {opts['scan']}")
+        installed = scan_manifests(opts["scan"])
+        lookups = sorted(installed)
+
+        def scan_row(index, row):
+            system, pkg = lookups[index]
+            return {
+                "system": system.lower(),
+                "package": pkg,
+                "installed": ",".join(installed[(system, pkg)]),
+                "latest": row["version"],
+                "published": row["published"],
+                "status": row["status"],
+            }
+
+        run(lookups, scan_row, SCAN_FIELDS, opts)
+        return
+
+    if len(positional) < 2:
+        print("Usage: get-versions.py [options] <system> <package1> [package2] ...")
+        print("       get-versions.py [options] --scan <root>")
+        print("Systems: npm, pypi, go, cargo, maven, nuget, rubygems")
+        sys.exit(1)
+
+    system = positional[0].upper()
+    packages = positional[1:]
+
+    valid_systems = ["NPM", "PYPI", "GO", "CARGO", "MAVEN", "NUGET", "RUBYGEMS"]
+    if system not in valid_systems:
+        print(f"Error: Invalid system '{positional[0]}'. Use: {', '.join(s.lower() for s in valid_systems)}")
+        sys.exit(1)
+
+    run([(system, pkg) for pkg in packages], lambda index, row: row, PACKAGE_FIELDS, opts)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,42 @@
 #!/usr/bin/env bash
 # Ensure a public git repo is shallow-cloned into a local cache and echo its
 # absolute path. Works with any git host (GitHub, GitLab, Bitbucket, self-hosted).
-# Idempotent — safe to call repeatedly.
+# Idempotent — safe to call repeatedly, including from concurrent agents.
 #
 # Usage:
 #   git-clone.sh <repo> [--branch BRANCH] [--refresh] [--cache-dir DIR]
+#                [--partial] [--sparse PATHS] [--max-size MB]
 #
 # Repo argument forms:
 #   owner/repo                       GitHub shortcut → https://github.com/owner/repo.git
 #   https://host/path[.git]          Any HTTPS git URL
 #   git@host:path[.git]              SSH form
 #   ssh://git@host[:port]/path[.git] Explicit SSH URL
+#   file:///path/to/repo             Local repository (handy for testing)
 #
 # Options:
 #   --branch X       Clone a specific branch (default: repo default branch)
 #   --refresh        Pull latest if cache exists (default: keep cached state)
 #   --cache-dir DIR  Override cache root (default: ~/.cache/clio-repos)
+#   --partial        Partial clone: fetch commits and trees now, file contents
+#                    only when checked out or read (--filter=blob:none)
+#   --sparse PATHS   Check out only these directories (comma-separated, cone
+#                    mode); pass again with other paths to change the set
+#   --max-size MB    After cloning, evict least-recently-used checkouts until
+#                    the cache is under MB (default: $CLIO_REPOS_MAX_MB or
+#                    10240; 0 disables eviction)
+#
+# Cache layout:
+#   <cache>/.objects/<repo>.git    one shared object store per repo (bare)
+#   <cache>/<repo>[--<branch>]     one checkout per branch: a git worktree of
+#                                  the store, so branches share objects
+#   <cache>/.locks/<repo>.lock     per-repo lock; concurrent calls for the same
+#                                  repo wait (up to $CLIO_REPOS_LOCK_TIMEOUT
+#                                  seconds, default 600) instead of racing
+# Each use marks a checkout as recently used. Eviction removes whole
+# checkouts (oldest first, skipping repos another call holds locked) and an
+# object store once its last checkout is gone. Standalone clones made by
+# earlier versions of this script keep working and are evicted the same way.
 #
 # Output: absolute path to the cached repo directory on stdout.
 #
@@ -24,13 +45,18 @@
 #   git-clone.sh https://gitlab.com/group/subgroup/proj
 #   git-clone.sh git@github.com:vercel/next.js.git --branch canary
 #   git-clone.sh https://gitlab.jmango360.com/team/repo --refresh
+#   git-clone.sh vercel/next.js --partial --sparse packages/next/src/server
 
 set -euo pipefail
 
 repo=""
 branch=""
 refresh=0
+partial=0
+sparse=""
 cache_base="${HOME}/.cache/clio-repos"
+max_mb="${CLIO_REPOS_MAX_MB:-10240}"
+lock_timeout="${CLIO_REPOS_LOCK_TIMEOUT:-600}"
 
 while [[ $# -gt 0 ]]; do
   case "$1" in
@@ -42,6 +68,15 @@ while [[ $# -gt 0 ]]; do
     --cache-dir)
       [[ $# -lt 2 ]] && { echo "Error: --cache-dir requires a value" >&2; exit 1; }
       cache_base="$2"; shift 2 ;;
+    --partial)
+      partial=1; shift ;;
+    --sparse)
+      [[ $# -lt 2 ]] && { echo "Error: --sparse requires a value" >&2; exit 1; }
+      sparse="$2"; shift 2 ;;
+    --max-size)
+      [[ $# -lt 2 ]] && { echo "Error: --max-size requires a value" >&2; exit 1; }
+      [[ "$2" =~ ^[0-9]+$ ]] || { echo "Error: --max-size must be a whole number of MB, got '$2'" >&2; exit 1; }
+      max_mb="$2"; shift 2 ;;
     -h|--help)
       sed -n '2,/^$/p' "$0" | sed 's/^# \{0,1\}//'
       exit 0 ;;
@@ -55,7 +90,7 @@ done
 
 if [[ -z "$repo" ]]; then
   echo "Error: missing repo argument" >&2
-  echo "Usage: git-clone.sh <repo> [--branch X] [--refresh] [--cache-dir DIR]" >&2
+  echo "Usage: git-clone.sh <repo> [--branch X] [--refresh] [--cache-dir DIR] [--partial] [--sparse PATHS] [--max-size MB]" >&2
   exit 1
 fi
 
@@ -73,35 +108,206 @@ else
   exit 1
 fi
 
-# Derive a stable cache key from the URL.
-key="$url"
-key="${key#http://}"
-key="${key#https://}"
-key="${key#ssh://}"
-key="${key#git@}"
-# SSH form host:path → host/path (replace first ':' with '/')
-key="${key/:/\/}"
-# Strip trailing .git
-key="${key%.git}"
-# Strip trailing /
-key="${key%/}"
-# Replace path separators with --
-key="${key//\//--}"
-[[ -n "$branch" ]] && key="${key}--${branch//\//_}"
+# Derive a stable cache key from a clone URL.
+url_key() {
+  local key="$1"
+  key="${key#http://}"
+  key="${key#https://}"
+  key="${key#ssh://}"
+  key="${key#file://}"
+  key="${key#git@}"
+  key="${key#/}"
+  # SSH form host:path → host/path (replace first ':' with '/')
+  key="${key/:/\/}"
+  # Strip trailing .git
+  key="${key%.git}"
+  # Strip trailing /
+  key="${key%/}"
+  # Replace path separators with --
+  printf '%s' "${key//\//--}"
+}
+
+# mkdir is atomic everywhere (flock is not on macOS). The holder's pid is
+# recorded so a lock left by a killed process can be broken.
+held_locks=()
+acquire_lock() {
+  local lock="$1" timeout="$2" waited=0 holder
+  while ! mkdir "$lock" 2>/dev/null; do
+    holder=$(cat "$lock/pid" 2>/dev/null || true)
+    if [[ -n "$holder" ]] && ! kill -0 "$holder" 2>/dev/null; then
+      # Re-read so a lock re-taken in the meantime is not removed
+      [[ "$(cat "$lock/pid" 2>/dev/null || true)" == "$holder" ]] && rm -rf "$lock"
+      continue
+    fi
+    [[ "$waited" -ge "$timeout" ]] && return 1
+    [[ "$waited" -eq 0 && "$timeout" -gt 0 ]] && echo "Waiting for lock ${lock}..." >&2
+    sleep 1
+    waited=$((waited + 1))
+  done
+  echo "$$" > "$lock/pid"
+  held_locks+=("$lock")
+}
+
+release_lock() {
+  local lock="$1" kept=() held
+  rm -rf "$lock"
+  for held in ${held_locks[@]+"${held_locks[@]}"}; do
+    [[ "$held" != "$lock" ]] && kept+=("$held")
+  done
+  held_locks=(${kept[@]+"${kept[@]}"})
+}
+
+release_all_locks() {
+  local held
+  for held in ${held_locks[@]+"${held_locks[@]}"}; do
+    rm -rf "$held"
+  done
+}
+trap release_all_locks EXIT
+
+mtime() {
+  stat -c %Y "$1" 2>/dev/null || stat -f %m "$1"
+}
 
+# Drop objects no refs/clio ref reaches any more. gc alone frees nothing in
+# a --partial store: it keeps every object of a promisor pack, reachable or
+# not, so those stores are repacked from their refs instead.
+compact_store() {
+  local store="$1" pack old
+  if [[ "$(git -C "$store" config --bool remote.origin.promisor 2>/dev/null)" == "true" ]]; then
+    # --all and --indexed-objects also keep what the worktrees' HEADs and
+    # indexes still use
+    pack=$(git -C "$store" pack-objects --revs --all --indexed-objects --missing=allow-any \
+      --quiet "${store}/objects/pack/pack" </dev/null) || return 1
+    touch "${store}/objects/pack/pack-${pack}.promisor"
+    for old in "${store}"/objects/pack/pack-*.pack; do
+      [[ "$old" == */pack-${pack}.pack ]] && continue
+      rm -f "${old%.pack}".{pack,idx,rev,bitmap,promisor}
+    done
+    git -C "$store" prune --expire=now >&2
+  else
+    # Bitmaps cannot be written for a store that was once partial
+    git -C "$store" -c repack.writeBitmaps=false gc --prune=now --quiet >&2
+  fi
+}
+
+# Least-recently-used eviction down to max_mb. Never touches $dest.
+evict() {
+  [[ "$max_mb" -gt 0 ]] || return 0
+  local limit_kb=$((max_mb * 1024)) total entry name gitdir store store_key lock suffix
+  total=$(du -sk "$cache_base" | cut -f1)
+  [[ "$total" -gt "$limit_kb" ]] || return 0
+
+  while IFS= read -r entry; do
+    [[ "$total" -le "$limit_kb" ]] && break
+    [[ "$entry" == "$dest" ]] && continue
+    name="${entry##*/}"
+    store=""
+    if [[ -f "${entry}/.git" ]]; then
+      gitdir=$(sed -n 's/^gitdir: //p' "${entry}/.git")
+      store="${gitdir%/worktrees/*}"
+      store_key="${store##*/}"
+      store_key="${store_key%.git}"
+    else
+      store_key=$(url_key "$(git -C "$entry" remote get-url origin 2>/dev/null || echo "$name")")
+    fi
+    lock="${cache_base}/.locks/${store_key}.lock"
+    # Skip repos another call is using right now
+    acquire_lock "$lock" 0 || continue
+    echo "Evicting ${entry} (least recently used)" >&2
+    if [[ -n "$store" && -d "$store" ]]; then
+      suffix="${name#"$store_key"}"
+      suffix="${suffix#--}"
+      git -C "$store" worktree remove --force "$entry" 2>/dev/null || rm -rf "$entry"
+      git -C "$store" worktree prune
+      git -C "$store" update-ref -d "refs/clio/${suffix:-HEAD}" 2>/dev/null || true
+      # Remote-tracking refs left by stores fetched with the default refspec
+      # would keep the evicted branch's objects alive
+      git -C "$store" for-each-ref --format='delete %(refname)' refs/remotes \
+        | git -C "$store" update-ref --stdin 2>/dev/null || true
+      if [[ -z "$(git -C "$store" for-each-ref --count=1 refs/clio)" ]]; then
+        rm -rf "$store"
+      else
+        # Best effort: a failed cleanup must not fail the clone
+        compact_store "$store" || true
+      fi
+    else
+      rm -rf "$entry"
+    fi
+    release_lock "$lock"
+    total=$(du -sk "$cache_base" | cut -f1)
+  done < <(
+    for entry in "$cache_base"/*; do
+      [[ -e "${entry}/.git" ]] && printf '%s\t%s\n' "$(mtime "${entry}/.git")" "$entry"
+    done | sort -n | cut -f2-
+  )
+}
+
+repo_key=$(url_key "$url")
+key="$repo_key"
+ref="refs/clio/HEAD"
+if [[ -n "$branch" ]]; then
+  key="${key}--${branch//\//_}"
+  ref="refs/clio/${branch//\//_}"
+fi
+
+mkdir -p "$cache_base/.objects" "$cache_base/.locks"
+cache_base="$(cd "$cache_base" && pwd)"
 dest="${cache_base}/${key}"
+store="${cache_base}/.objects/${repo_key}.git"
+lock="${cache_base}/.locks/${repo_key}.lock"
+
+acquire_lock "$lock" "$lock_timeout" || {
+  echo "Error: timed out after ${lock_timeout}s waiting for ${lock} (remove it if no other git-clone.sh is running)" >&2
+  exit 1
+}
 
-mkdir -p "$cache_base"
+fetch_into_store() {
+  if [[ ! -d "$store" ]]; then
+    git init --bare --quiet "$store"
+    git -C "$store" remote add origin "$url"
+  fi
+  if [[ "$partial" -eq 1 ]]; then
+    git -C "$store" config remote.origin.promisor true
+    git -C "$store" config remote.origin.partialclonefilter blob:none
+  fi
+  # Empty --refmap: only ${ref} is written, no refs/remotes/origin/* that
+  # would outlive the checkout's eviction
+  git -C "$store" fetch --depth=1 --quiet --refmap= origin "+${branch:-HEAD}:${ref}" >&2
+}
+
+apply_sparse() {
+  local paths=()
+  IFS=',' read -r -a paths <<< "$sparse"
+  git -C "$dest" sparse-checkout set --cone "${paths[@]}" >&2
+}
 
 if [[ -d "${dest}/.git" ]]; then
+  # Standalone clone from an earlier version of this script
   if [[ "$refresh" -eq 1 ]]; then
     git -C "$dest" fetch --depth=1 --quiet origin "${branch:-HEAD}" >&2
     git -C "$dest" reset --hard --quiet "FETCH_HEAD" >&2
   fi
+  [[ -n "$sparse" ]] && apply_sparse
+elif [[ -f "${dest}/.git" ]]; then
+  if [[ "$refresh" -eq 1 ]]; then
+    fetch_into_store
+    git -C "$dest" reset --hard --quiet "$ref" >&2
+  fi
+  [[ -n "$sparse" ]] && apply_sparse
 else
-  clone_args=(--depth=1 --quiet)
-  [[ -n "$branch" ]] && clone_args+=(--branch "$branch" --single-branch)
-  git clone "${clone_args[@]}" "$url" "$dest" >&2
+  fetch_into_store
+  # Leftovers of an interrupted run
+  rm -rf "$dest"
+  git -C "$store" worktree prune
+  git -C "$store" worktree add --quiet --detach --no-checkout "$dest" "$ref" >&2
+  [[ -n "$sparse" ]] && apply_sparse
+  git -C "$dest" reset --hard --quiet "$ref" >&2
 fi
 
+# Mark as recently used for eviction
+touch "${dest}/.git"
+release_lock "$lock"
+evict
+
 echo "$dest"
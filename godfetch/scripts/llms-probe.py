@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Probe a docs site for llms.txt / llms-full.txt, with a result cache and a
+local section index for llms-full.txt.
+
+Usage:
+    python3 llms-probe.py [options] <domain-or-url>
+    python3 llms-probe.py --sections <domain-or-url>
+    python3 llms-probe.py --section "<heading>" <domain-or-url>
+
+Examples:
+    python3 llms-probe.py react.dev
+    python3 llms-probe.py https://docs.cloudflare.com
+    python3 llms-probe.py --sections orm.drizzle.team
+    python3 llms-probe.py --section "Migrations" orm.drizzle.team
+
+Probes (HEAD, follows redirects):
+    /llms.txt, /llms-full.txt
+    /docs/llms.txt, /docs/llms-full.txt
+    /en/llms.txt, /en/llms-full.txt
+All paths are probed concurrently. Each worker keeps one keep-alive
+connection per host, so the size lookup and redirect hops reuse it.
+Filters: status 200 + non-HTML content-type (some sites soft-404 with HTML).
+An http:// URL is probed over plain HTTP (e.g. a local stand-in); anything
+else over HTTPS.
+
+Options:
+    --max-age <seconds>     Reuse a cached hit, or a cached llms-full.txt,
+                            younger than this (default: 86400 = 24h). An older
+                            llms-full.txt is revalidated with a conditional
+                            request.
+    --negative-max-age <s>  Reuse a cached miss younger than this
+                            (default: 3600 = 1h)
+    --refresh               Ignore cached results and probe again (the new
+                            results are still cached)
+    --timeout <seconds>     Per-request timeout (default: 8)
+    --workers <n>           Concurrent probes (default: 6)
+
+llms-full.txt:
+    --fetch-full            Download llms-full.txt into the cache (once; later
+                            calls revalidate it) and print its local path
+    --sections              Print the heading index of the cached copy
+    --section <heading>     Print only the matching section(s) of the cached
+                            copy: exact heading match (case-insensitive) if
+                            any, otherwise every heading containing the text.
+                            A section runs to the next heading of the same or
+                            a higher level, so it includes its subsections.
+    The llms-full.txt URL is the one the probe finds, or <url> itself if it
+    already ends in llms-full.txt. --sections and --section download the file
+    first if needed; afterwards they read only the requested byte range.
+
+Output:
+    Probe: TSV kind \\t url \\t size
+        kind: "index" (llms.txt) or "full" (llms-full.txt)
+        size: human-readable (e.g. 478KB, 4.8MB) or "?" if no Content-Length
+    --sections: TSV level \\t line \\t size \\t heading
+        line: 1-based line of the heading in the --fetch-full file
+    --section: the section text, verbatim
+
+Cache:
+    ~/.cache/godfetch/llms/ (honors XDG_CACHE_HOME): one JSON file of probe
+    results per host (hits and misses, each with its own age), and
+    full/<hash>.txt + full/<hash>.json (copy of llms-full.txt, its ETag /
+    Last-Modified and heading offsets). Network errors are not cached.
+
+Exit: 0 if any file found (or the section was printed), 1 otherwise.
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+
+PATHS = (
+    "/llms.txt",
+    "/llms-full.txt",
+    "/docs/llms.txt",
+    "/docs/llms-full.txt",
+    "/en/llms.txt",
+    "/en/llms-full.txt",
+)
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "godfetch",
+    "llms",
+)
+CACHE_VERSION = 1
+
+DEFAULT_MAX_AGE = 24 * 3600
+DEFAULT_NEGATIVE_MAX_AGE = 3600
+DEFAULT_TIMEOUT = 8.0
+DEFAULT_WORKERS = len(PATHS)
+MAX_REDIRECTS = 10
+READ_CHUNK = 64 * 1024
+USER_AGENT = "godfetch-llms-probe/1"
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+HEADING_RE = re.compile(rb"(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*\r?$")
+
+
+def fail(msg):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def human_size(n):
+    if not n:
+        return "?"
+    if n < 1024:
+        return f"{n}B"
+    if n < 1048576:
+        return f"{n // 1024}KB"
+    return f"{n / 1048576:.1f}MB"
+
+
+def site_base(target):
+    """Return scheme://host[:port] for a domain or URL (path and query dropped)."""
+    scheme = "http" if target.startswith("http://") else "https"
+    parts = urllib.parse.urlsplit(target if "://" in target else f"https://{target}")
+    if not parts.netloc:
+        fail(f"cannot parse domain from '{target}'")
+    return f"{scheme}://{parts.netloc.lower()}"
+
+
+class Client:
+    """HTTP/1.1 client with one keep-alive connection per (thread, host)."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _connection(self, scheme, netloc):
+        conns = self._local.__dict__.setdefault("conns", {})
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(netloc, timeout=self.timeout)
+            conns[(scheme, netloc)] = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _drop(self, url):
+        parts = urllib.parse.urlsplit(url)
+        conn = self._local.__dict__.get("conns", {}).get((parts.scheme, parts.netloc))
+        if conn is not None:
+            conn.close()
+
+    def request(self, method, url, headers=None):
+        """Send one request (no redirects); the caller reads the body, then calls done()."""
+        parts = urllib.parse.urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request_headers = {"User-Agent": USER_AGENT, "Connection": "keep-alive"}
+        request_headers.update(headers or {})
+        while True:
+            conn = self._connection(parts.scheme, parts.netloc)
+            reused = conn.sock is not None
+            try:
+                conn.request(method, target, headers=request_headers)
+                return conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # A keep-alive connection the server already closed fails on
+                # first use; retry once on a fresh one.
+                if not reused:
+                    raise
+
+    def done(self, url, response):
+        if response.will_close:
+            self._drop(url)
+
+    def head(self, url):
+        """HEAD url following redirects; return (status, final url, headers)."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self.request("HEAD", url)
+            response.read()
+            self.done(url, response)
+            location = response.headers.get("Location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response.status, url, response.headers
+            url = urllib.parse.urljoin(url, location)
+        raise http.client.HTTPException(f"more than {MAX_REDIRECTS} redirects")
+
+    def total_length(self, url):
+        """Size from a 1-byte range GET's Content-Range, for servers whose HEAD omits it."""
+        response = self.request("GET", url, {"Range": "bytes=0-0"})
+        if response.status != 206:
+            # Range ignored: the body is the whole file, which is not worth reading
+            self._drop(url)
+            return None
+        response.read()
+        self.done(url, response)
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def probe(client, url):
+    """Return a cache entry for one candidate URL. Raises on network errors."""
+    status, final, headers = client.head(url)
+    if status != 200 or "text/html" in headers.get("Content-Type", ""):
+        return {"found": False}
+    length = headers.get("Content-Length", "")
+    length = int(length) if length.isdigit() and length != "0" else None
+    if length is None:
+        try:
+            length = client.total_length(final)
+        except (http.client.HTTPException, OSError):
+            pass
+    return {"found": True, "url": final, "length": length}
+
+
+def host_cache_path(base):
+    name = re.sub(r"[^\w.-]", "_", base.replace("://", "--"))
+    return os.path.join(CACHE_DIR, f"{name}.json")
+
+
+def load_json(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) and data.get("version") == CACHE_VERSION else None
+
+
+def store_json(path, data):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write {path}: {e}", file=sys.stderr)
+
+
+def probe_site(base, client, opts):
+    """Return (hits, failures): hits are [(kind, url, length)] in PATHS order, deduped by final URL."""
+    cache_file = host_cache_path(base)
+    cached = load_json(cache_file) or {}
+    entries = dict(cached.get("paths", {}))
+    now = time.time()
+
+    def fresh(entry):
+        max_age = opts["max_age"] if entry.get("found") else opts["negative_max_age"]
+        return now - entry.get("checked", 0) < max_age
+
+    stale = [path for path in PATHS if opts["refresh"] or not fresh(entries.get(path, {}))]
+    failures = []
+    if stale:
+        def attempt(path):
+            try:
+                return path, probe(client, base + path)
+            except (http.client.HTTPException, OSError) as e:
+                return path, str(e) or type(e).__name__
+
+        with ThreadPoolExecutor(min(opts["workers"], len(stale))) as pool:
+            for path, result in pool.map(attempt, stale):
+                if isinstance(result, str):
+                    failures.append(f"{path}: {result}")
+                else:
+                    entries[path] = dict(result, checked=time.time())
+        probed = {path: entries[path] for path in stale if path in entries}
+        if probed:
+            # Re-read so results another call wrote meanwhile for other paths survive
+            merged = dict((load_json(cache_file) or {}).get("paths", {}))
+            merged.update(probed)
+            store_json(cache_file, {"version": CACHE_VERSION, "base": base, "paths": merged})
+
+    hits, seen = [], set()
+    for path in PATHS:
+        entry = entries.get(path)
+        if not entry or not entry.get("found") or entry["url"] in seen:
+            continue
+        seen.add(entry["url"])
+        kind = "full" if "llms-full.txt" in entry["url"] else "index"
+        hits.append((kind, entry["url"], entry.get("length")))
+    return hits, failures
+
+
+def find_full_url(target, client, opts):
+    if urllib.parse.urlsplit(target).path.endswith("llms-full.txt") and "://" in target:
+        return target
+    base = site_base(target)
+    hits, _ = probe_site(base, client, opts)
+    for kind, url, _ in hits:
+        if kind == "full":
+            return url
+    fail(f"No llms-full.txt found at {base} — use the llms.txt index instead")
+
+
+def full_cache_paths(url):
+    key = hashlib.sha256(url.encode()).hexdigest()[:16]
+    stem = os.path.join(CACHE_DIR, "full", key)
+    return f"{stem}.txt", f"{stem}.json"
+
+
+def index_headings(lines, sections, state):
+    """Record [level, heading, line, start] for Markdown ATX headings outside code fences."""
+    for line in lines:
+        state["line"] += 1
+        stripped = line.lstrip(b" ")
+        if state["fence"]:
+            if stripped.startswith(state["fence"]):
+                state["fence"] = None
+        elif stripped[:3] in (b"```", b"~~~"):
+            state["fence"] = stripped[:3]
+        elif line.startswith(b"#"):
+            match = HEADING_RE.match(line)
+            if match:
+                heading = match.group(2).decode("utf-8", "replace").strip()
+                sections.append([len(match.group(1)), heading, state["line"], state["offset"]])
+        state["offset"] += len(line) + 1
+
+
+def download_full(client, url, body_path, response):
+    """Stream a 200 response to body_path, indexing headings on the way; return the metadata."""
+    sections = []
+    state = {"line": 0, "offset": 0, "fence": None}
+    tmp = f"{body_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as out:
+            pending = b""
+            while True:
+                chunk = response.read(READ_CHUNK)
+                if not chunk:
+                    break
+                out.write(chunk)
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                index_headings(lines, sections, state)
+            if pending:
+                index_headings([pending], sections, state)
+        client.done(url, response)
+        size = os.path.getsize(tmp)
+        os.replace(tmp, body_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    # A section ends where the next heading of the same or a higher level starts
+    open_sections = []
+    for section in sections:
+        while open_sections and open_sections[-1][0] >= section[0]:
+            open_sections.pop().append(section[3])
+        open_sections.append(section)
+    for section in open_sections:
+        section.append(size)
+
+    return {
+        "version": CACHE_VERSION,
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched": time.time(),
+        "size": size,
+        "sections": sections,
+    }
+
+
+def ensure_full(client, url, opts):
+    """Return (body path, metadata) for a cached, fresh-enough copy of llms-full.txt."""
+    body_path, meta_path = full_cache_paths(url)
+    meta = load_json(meta_path)
+    try:
+        if meta and os.path.getsize(body_path) != meta["size"]:
+            meta = None
+    except OSError:
+        meta = None
+    if meta and not opts["refresh"] and time.time() - meta["fetched"] < opts["max_age"]:
+        return body_path, meta
+
+    headers = {}
+    if meta and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    os.makedirs(os.path.dirname(body_path), exist_ok=True)
+    try:
+        response = client.request("GET", url, headers)
+        if response.status == 304 and meta:
+            response.read()
+            client.done(url, response)
+            meta["fetched"] = time.time()
+        elif response.status == 200:
+            meta = download_full(client, url, body_path, response)
+        else:
+            response.read()
+            client.done(url, response)
+            if not meta:
+                fail(f"GET {url} answered {response.status}")
+            print(f"Warning: GET {url} answered {response.status}; using cached copy", file=sys.stderr)
+            return body_path, meta
+    except (http.client.HTTPException, OSError) as e:
+        if not meta:
+            fail(f"could not download {url}: {e}")
+        print(f"Warning: could not revalidate {url} ({e}); using cached copy", file=sys.stderr)
+        return body_path, meta
+    store_json(meta_path, meta)
+    return body_path, meta
+
+
+def matching_sections(sections, query):
+    """Exact heading matches if any, else substring matches; nested matches are folded into their parent."""
+    query = query.lower()
+    matches = [s for s in sections if s[1].lower() == query]
+    if not matches:
+        matches = [s for s in sections if query in s[1].lower()]
+    outermost = []
+    for section in matches:
+        if not outermost or section[3] >= outermost[-1][4]:
+            outermost.append(section)
+    return outermost
+
+
+def parse_number(flag, value, kind=float):
+    try:
+        number = kind(value)
+    except ValueError:
+        fail(f"{flag} must be a number, got '{value}'")
+    if number < 0:
+        fail(f"{flag} must not be negative")
+    return number
+
+
+def parse_args(args):
+    opts = {
+        "max_age": DEFAULT_MAX_AGE,
+        "negative_max_age": DEFAULT_NEGATIVE_MAX_AGE,
+        "refresh": False,
+        "timeout": DEFAULT_TIMEOUT,
+        "workers": DEFAULT_WORKERS,
+        "fetch_full": False,
+        "sections": False,
+        "section": None,
+    }
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] in ("--max-age", "--negative-max-age", "--timeout", "--workers", "--section"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            if args[i] == "--workers":
+                opts["workers"] = max(1, parse_number(args[i], args[i + 1], int))
+            elif args[i] == "--section":
+                opts["section"] = args[i + 1]
+            else:
+                opts[args[i][2:].replace("-", "_")] = parse_number(args[i], args[i + 1])
+            i += 2
+        elif args[i] in ("--refresh", "--fetch-full", "--sections"):
+            opts[args[i][2:].replace("-", "_")] = True
+            i += 1
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        elif args[i].startswith("--"):
+            fail(f"Unknown option: {args[i]}")
+        else:
+            positional.append(args[i])
+            i += 1
+    if len(positional) != 1:
+        usage()
+        sys.exit(1)
+    if opts["timeout"] <= 0:
+        fail("--timeout must be positive")
+    if sum((opts["fetch_full"], opts["sections"], opts["section"] is not None)) > 1:
+        fail("--fetch-full, --sections and --section are mutually exclusive")
+    return positional[0], opts
+
+
+def main():
+    target, opts = parse_args(sys.argv[1:])
+    client = Client(opts["timeout"])
+    try:
+        if not (opts["fetch_full"] or opts["sections"] or opts["section"] is not None):
+            base = site_base(target)
+            hits, failures = probe_site(base, client, opts)
+            for kind, url, length in hits:
+                print(f"{kind}\t{url}\t{human_size(length)}")
+            if not hits:
+                detail = f" ({len(failures)} probes failed: {failures[0]})" if failures else ""
+                print(f"No llms.txt found at {base}{detail}", file=sys.stderr)
+                sys.exit(1)
+            return
+
+        url = find_full_url(target, client, opts)
+        body_path, meta = ensure_full(client, url, opts)
+        if opts["fetch_full"]:
+            print(body_path)
+            print(
+                f"llms-probe: {url} cached ({human_size(meta['size'])}, {len(meta['sections'])} sections)",
+                file=sys.stderr,
+            )
+        elif opts["sections"]:
+            for level, heading, line, start, end in meta["sections"]:
+                print(f"{level}\t{line}\t{human_size(end - start)}\t{heading}")
+        else:
+            matches = matching_sections(meta["sections"], opts["section"])
+            if not matches:
+                print(f"No section matching '{opts['section']}' in {url} (see --sections)", file=sys.stderr)
+                sys.exit(1)
+            with open(body_path, "rb") as f:
+                for _, _, _, start, end in matches:
+                    f.seek(start)
+                    sys.stdout.buffer.write(f.read(end - start))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
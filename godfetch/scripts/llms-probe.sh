@@ -19,6 +19,8 @@
 #   /en/llms.txt, /en/llms-full.txt
 #
 # Filters: status 200 + non-HTML content-type (some sites soft-404 with HTML).
+# llms-probe.py probes the same paths concurrently, caches results per host and
+# indexes llms-full.txt sections; keep the path list in sync with it.
 # Exit: 0 if any file found, 1 otherwise.
 
 set -euo pipefail
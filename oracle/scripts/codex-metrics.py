@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Summarize Codex run metrics recorded with --metrics.
+
+Usage:
+    python3 codex-metrics.py [options] <metrics.ndjson>...
+    python3 codex-metrics.py [options] -
+
+Reads the NDJSON records that codex-review.py and codex-oracle.py append
+with --metrics (or $CODEX_METRICS_FILE) and prints, per group of runs, the
+p50/p90/p99/max of each latency and the average token usage.
+
+Options:
+    --by <fields>           Comma-separated record fields to group by
+                            (default: script,mode; "none" for one group)
+    --since <hours>         Only include runs started in the last n hours
+
+Latencies (milliseconds from just before the Codex process was spawned):
+    spawn           Popen returned
+    thread_started  Codex emitted thread.started (session is up)
+    first_message   First agent_message arrived
+    wall            Process exited
+"""
+
+import json
+import math
+import sys
+import time
+
+
+LATENCIES = ("spawn_ms", "thread_started_ms", "first_message_ms", "wall_ms")
+
+
+def fail(msg):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list.
+
+    >>> percentile(list(range(1, 11)), 50), percentile([1, 2], 50), percentile([1, 2, 3, 4], 75)
+    (5, 1, 3)
+    >>> percentile([1, 2, 3], 0), percentile([1, 2, 3], 100), percentile([], 50)
+    (1, 3, None)
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def format_ms(value):
+    if value is None:
+        return "-"
+    if value < 1000:
+        return f"{value:.0f}ms"
+    return f"{value / 1000:.1f}s"
+
+
+def read_records(paths, since):
+    records = []
+    for path in paths:
+        try:
+            f = sys.stdin if path == "-" else open(path, "r")
+        except OSError as e:
+            fail(f"Cannot read {path}: {e.strerror}")
+        with f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Warning: {path}:{number}: skipping invalid JSON", file=sys.stderr)
+                    continue
+                if since and record.get("started_at", 0) < since:
+                    continue
+                records.append(record)
+    return records
+
+
+def summarize(label, records):
+    failed = sum(1 for r in records if r.get("exit_code") != 0)
+    print(f"{label}: {len(records)} runs, {failed} failed")
+    print(f"  {'':<16}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for field in LATENCIES:
+        values = sorted(r[field] for r in records if isinstance(r.get(field), (int, float)))
+        cells = [format_ms(percentile(values, p)) for p in (50, 90, 99)]
+        cells.append(format_ms(values[-1] if values else None))
+        print(f"  {field[:-3]:<16}" + "".join(f"{cell:>9}" for cell in cells))
+
+    totals = {}
+    for record in records:
+        for key, value in (record.get("usage") or {}).items():
+            totals[key] = totals.get(key, 0) + value
+    if totals:
+        parts = [f"{key.replace('_tokens', '')} {value / len(records):,.0f}" for key, value in sorted(totals.items())]
+        line = f"  tokens/run: {', '.join(parts)}"
+        if totals.get("input_tokens"):
+            line += f" (cached {totals.get('cached_input_tokens', 0) / totals['input_tokens']:.0%} of input)"
+        print(line)
+
+
+def parse_args(args):
+    group_by = ["script", "mode"]
+    since = 0.0
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] in ("--by", "--since"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            if args[i] == "--by":
+                group_by = [] if args[i + 1] == "none" else [f for f in args[i + 1].split(",") if f]
+            else:
+                try:
+                    since = time.time() - float(args[i + 1]) * 3600
+                except ValueError:
+                    fail(f"--since must be a number, got '{args[i + 1]}'")
+            i += 2
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        elif args[i].startswith("--"):
+            fail(f"Unknown option: {args[i]}")
+        else:
+            paths.append(args[i])
+            i += 1
+    if not paths:
+        fail("at least one metrics file (or - for stdin) is required")
+    return group_by, since, paths
+
+
+def main():
+    group_by, since, paths = parse_args(sys.argv[1:])
+    records = read_records(paths, since)
+    if not records:
+        fail("no metrics records found")
+
+    groups = {}
+    for record in records:
+        key = tuple(str(record.get(field, "-")) for field in group_by)
+        groups.setdefault(key, []).append(record)
+    for n, key in enumerate(sorted(groups)):
+        if n:
+            print()
+        summarize(" ".join(key) or "all", groups[key])
+
+
+if __name__ == "__main__":
+    main()
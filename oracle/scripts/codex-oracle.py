@@ -4,25 +4,110 @@ Run a deep analysis using Codex CLI.
 
 Usage:
     python3 codex-oracle.py --question "..." [options]
+    python3 codex-oracle.py --batch <questions.jsonl|-> [options]
 
 Options:
-    --question <text>       The question or analysis request (required)
+    --question <text>       The question or analysis request (required
+                            unless --batch is given)
+    --batch <file|->        Answer many questions concurrently; reads JSONL
+                            from the file, or stdin for "-"
+    --jobs <n>              Max concurrent Codex processes for --batch
+                            (default: 4)
     --session-id <id>       Resume a previous Codex session for follow-up
-    --context-file <path>   Add context file content to the prompt (repeatable)
+    --context-file <path>   Add context file content to the prompt (repeatable);
+                            "path:120-340" or "path:120" includes only
+                            those lines
+    --max-context-tokens <n>
+                            Cap the packed context at ~n tokens, estimated
+                            as 4 bytes each (default: 100000)
+    --max-context-bytes <n> Cap the packed context at n bytes
     --focus <text>          Narrow the analysis to specific concerns
+    --new-session           Do not resume a cached session for this context
+    --session-ttl <seconds> Resume cached sessions only if used within this
+                            long (default: 21600 = 6h)
+    --metrics <file>        Append per-run timings and token usage to file as
+                            NDJSON (default: $CODEX_METRICS_FILE); summarize
+                            with codex-metrics.py
     --dry-run               Print the command without running Codex
 
 Notes:
     - Requires the 'oracle' profile in ~/.codex/config.toml
     - Session IDs are returned in the output for follow-up queries
+
+Batch mode:
+    Each JSONL line is an object {"question": "...", "focus": "...",
+    "context_files": ["path", "path:10-80"], "session_id": "...", "id": any}
+    where only "question" is required (a bare JSON string also works).
+    Command-line --context-file content is packed once and shared by every
+    question; per-question context_files are packed for that question into
+    what is left of the budget, and --focus is the default for questions
+    without their own. Each question starts a new
+    session (or follows up on its "session_id"); the session cache is not
+    used. One NDJSON record per question is printed as it finishes:
+        {"index", "id", "question", "session_id", "exit_code", "duration",
+         "answer"}
+    "index" is the question's position among non-blank lines. Exits 1 if any
+    question failed.
+
+Session reuse:
+    A consultation with --context-file (and no --session-id) records its
+    thread id under ~/.cache/codex-oracle/sessions/ (honors XDG_CACHE_HOME),
+    keyed by a digest of the working directory, --focus, the context budget
+    and the context files' contents. A later question over the same context
+    resumes that thread with only the new question instead of re-sending the
+    system prompt and files. Editing any context file changes the key; an
+    entry unused for --session-ttl seconds expires. If resuming fails, the
+    entry is dropped and a fresh session is started (the failed attempt's
+    output is not printed). A consultation whose context was trimmed to fit
+    the budget is not recorded: the thread only saw the chunks ranked for
+    its own question.
+
+Context packing:
+    Context files are read via mmap in ~4 KB line-aligned chunks. A file or
+    range given twice, and byte-identical chunks (copies of the same file,
+    repeated log blocks), are included once; later copies read
+    "[... lines X-Y identical to <file>:<lines> ...]". Over the budget,
+    chunks are ranked by overlap with the --question and --focus terms and
+    the best ones are kept in file order, with "[... lines X-Y omitted ...]"
+    markers. A per-file summary of what was included is printed to stderr.
 """
 
+import hashlib
 import json
+import math
+import mmap
 import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+
+
+SESSION_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "codex-oracle",
+    "sessions",
+)
+DEFAULT_SESSION_TTL = 6 * 3600
+
+DEFAULT_BATCH_JOBS = 4
+
+DEFAULT_CONTEXT_TOKENS = 100_000
+BYTES_PER_TOKEN = 4  # rough average for English prose and source code
+CHUNK_BYTES = 4096
+SCAN_BLOCK = 1 << 20
+
+LINE_RANGE_RE = re.compile(r"^(.+):(\d+)(?:-(\d+))?$")
+WORD_RE = re.compile(r"[a-z_][a-z0-9_]*")
+STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has him his how its may new now "
+    "see two way who did get let say she too use this that with have from they will what when where "
+    "which why would there their been into more some than then them these those does should could "
+    "about after also just like only over such very".split()
+)
 
 
 def fail(msg):
@@ -39,16 +124,262 @@ def require_codex():
         fail("Codex CLI not found in PATH. Install with: npm i -g @openai/codex && codex login")
 
 
-def build_context_block(context_files):
-    context = ""
-    for path in context_files:
-        if not os.path.isfile(path):
-            fail(f"Context file not found: {path}")
-        context += f"\n----- BEGIN: {path} -----\n"
-        with open(path, "r", errors="replace") as f:
-            context += f.read()
-        context += f"\n----- END: {path} -----\n"
-    return context
+def parse_context_spec(spec):
+    """Split "path", "path:120" or "path:120-340" into (path, first, last).
+
+    A path that exists as written wins, so file names containing ":" work.
+    """
+    if not os.path.isfile(spec):
+        match = LINE_RANGE_RE.match(spec)
+        if match:
+            path, first, last = match.groups()
+            first = int(first)
+            last = int(last) if last else first
+            if first < 1 or last < first:
+                fail(f"Invalid line range in context file: {spec}")
+            return path, first, last
+    return spec, 1, None
+
+
+def line_offset(data, line):
+    """Byte offset where 1-based `line` starts in data (len(data) if past the end)."""
+    pos = 0
+    remaining = line - 1
+    while remaining:
+        block = data[pos:pos + SCAN_BLOCK]
+        if not block:
+            return len(data)
+        found = block.count(b"\n")
+        if found < remaining:
+            pos += len(block)
+            remaining -= found
+            continue
+        while remaining:
+            pos = data.find(b"\n", pos) + 1
+            remaining -= 1
+    return pos
+
+
+def iter_chunks(data, start, end, first_line):
+    """Yield (start, end, first_line, last_line) line-aligned chunks of data[start:end]."""
+    line = first_line
+    while start < end:
+        limit = min(start + CHUNK_BYTES * 4, end)
+        stop = data.find(b"\n", min(start + CHUNK_BYTES, end) - 1, limit)
+        # No newline nearby (minified code, huge log lines): cut mid-line
+        stop = limit if stop == -1 else stop + 1
+        lines = data[start:stop].count(b"\n")
+        last = line + max(lines, 1) - 1
+        yield start, stop, line, last
+        line += lines
+        start = stop
+
+
+def query_terms(*texts):
+    terms = set()
+    for text in texts:
+        terms.update(w for w in WORD_RE.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS)
+    return terms
+
+
+def open_context(path):
+    """Return the file's contents as an mmap (or b"" when empty)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def build_context_block(context_files, question="", focus="", budget=None):
+    """Pack context files into a prompt block of at most `budget` bytes.
+
+    Returns (block, complete); complete is False when chunks were left out to
+    fit the budget, i.e. the block depends on the question it was ranked for.
+
+    Files are read through mmap and cut into line-aligned chunks. Repeated
+    files and byte-identical chunks are included once; later copies are
+    marked as identical to the first. When everything does not fit, chunks
+    are ranked by how often they mention the question's and focus's terms
+    (weighted by rarity across chunks) and the best ones are kept, in file
+    order, with omitted line ranges marked. A summary of what was included
+    goes to stderr.
+    """
+    if budget is None:
+        budget = DEFAULT_CONTEXT_TOKENS * BYTES_PER_TOKEN
+
+    sources = []  # (label, data, [chunk, ...], {label of earlier copy, ...}, path)
+    chunks = []  # dicts: source, start, end, first, last, index (unique chunks only)
+    seen_specs = set()
+    seen_chunks = {}
+    duplicates = 0
+    try:
+        for spec in context_files:
+            path, first, last = parse_context_spec(spec)
+            if not os.path.isfile(path):
+                fail(f"Context file not found: {path}")
+            key = (os.path.realpath(path), first, last)
+            if key in seen_specs:
+                continue
+            seen_specs.add(key)
+
+            data = open_context(path)
+            if b"\0" in data[:8192]:
+                print(f"context: skipped {path} (binary)", file=sys.stderr)
+                if isinstance(data, mmap.mmap):
+                    data.close()
+                continue
+            start = line_offset(data, first) if first > 1 else 0
+            end = line_offset(data, last + 1) if last else len(data)
+            label = path if last is None else f"{path}:{first}-{last}"
+            source = (label, data, [], set(), path)
+            sources.append(source)
+            for chunk_start, chunk_end, chunk_first, chunk_last in iter_chunks(data, start, end, first):
+                chunk = {
+                    "source": source, "start": chunk_start, "end": chunk_end,
+                    "first": chunk_first, "last": chunk_last,
+                }
+                source[2].append(chunk)
+                digest = hashlib.sha1(data[chunk_start:chunk_end]).digest()
+                if digest in seen_chunks:
+                    # Rendered as a pointer to the first copy, never ranked
+                    duplicates += 1
+                    chunk["copy_of"] = seen_chunks[digest]
+                    source[3].add(seen_chunks[digest]["source"][0])
+                    continue
+                chunk["index"] = len(chunks)
+                seen_chunks[digest] = chunk
+                chunks.append(chunk)
+
+        total = sum(chunk["end"] - chunk["start"] for chunk in chunks)
+        selected = set(range(len(chunks)))
+        if total > budget:
+            selected = rank_chunks(chunks, query_terms(question, focus), budget)
+
+        parts = []
+        for label, data, source_chunks, copies, _ in sources:
+            unique = [chunk for chunk in source_chunks if "copy_of" not in chunk]
+            report_source(label, unique, selected, copies)
+            if copies and not unique:
+                parts.append(f"\n----- {label}: identical to {', '.join(sorted(copies))} -----\n")
+                continue
+            parts.append(f"\n----- BEGIN: {label} -----\n")
+            position = source_chunks[0]["first"] if source_chunks else 1
+            for chunk in render_spans(source_chunks, selected):
+                if chunk["first"] > position:
+                    parts.append(f"[... lines {position}-{chunk['first'] - 1} omitted ...]\n")
+                if "copy_of" in chunk:
+                    original = chunk["copy_of"]
+                    parts.append(
+                        f"[... lines {chunk['first']}-{chunk['last']} identical to "
+                        f"{original['source'][4]}:{original['first']}-{original['last']} ...]\n"
+                    )
+                else:
+                    parts.append(data[chunk["start"]:chunk["end"]].decode("utf-8", errors="replace"))
+                position = chunk["last"] + 1
+            if source_chunks and position <= source_chunks[-1]["last"]:
+                parts.append(f"\n[... lines {position}-{source_chunks[-1]['last']} omitted ...]")
+            parts.append(f"\n----- END: {label} -----\n")
+        context = "".join(parts)
+    finally:
+        for _, data, _, _, _ in sources:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    included = sum(chunk["end"] - chunk["start"] for chunk in chunks if chunk["index"] in selected)
+    summary = (
+        f"context: {len(sources)} file(s), {included:,} of {total:,} bytes "
+        f"(~{included // BYTES_PER_TOKEN:,} tokens; budget {budget:,} bytes)"
+    )
+    if duplicates:
+        summary += f", {duplicates} duplicate chunk(s) skipped"
+    print(summary, file=sys.stderr)
+    return context, total <= budget
+
+
+def render_spans(source_chunks, selected):
+    """Yield a source's chunks to render, in order.
+
+    Unique chunks are yielded if selected. A duplicate is yielded if the copy
+    it points to was selected (otherwise its lines read as omitted), merged
+    with the duplicate before it when both continue the same run of lines.
+    """
+    pending = None
+    for chunk in source_chunks:
+        original = chunk.get("copy_of")
+        if original is None:
+            if pending:
+                yield pending
+                pending = None
+            if chunk["index"] in selected:
+                yield chunk
+            continue
+        if original["index"] not in selected:
+            continue
+        if (
+            pending
+            and pending["last"] + 1 == chunk["first"]
+            and pending["copy_of"]["source"] is original["source"]
+            and pending["copy_of"]["last"] + 1 == original["first"]
+        ):
+            copy_of = dict(pending["copy_of"], last=original["last"])
+            pending = dict(pending, last=chunk["last"], copy_of=copy_of)
+            continue
+        if pending:
+            yield pending
+        pending = chunk
+    if pending:
+        yield pending
+
+
+def rank_chunks(chunks, terms, budget):
+    """Pick the indices of the highest-scoring chunks that fit in budget bytes."""
+    counts = []
+    document_frequency = dict.fromkeys(terms, 0)
+    for chunk in chunks:
+        label, data = chunk["source"][:2]
+        words = WORD_RE.findall(data[chunk["start"]:chunk["end"]].decode("utf-8", errors="replace").lower())
+        words += WORD_RE.findall(label.lower())
+        found = {}
+        for word in words:
+            if word in document_frequency:
+                found[word] = found.get(word, 0) + 1
+        for word in found:
+            document_frequency[word] += 1
+        counts.append(found)
+
+    scores = []
+    for chunk, found in zip(chunks, counts):
+        score = sum(
+            math.log1p(count) * math.log((1 + len(chunks)) / (1 + document_frequency[word]))
+            for word, count in found.items()
+        )
+        scores.append((-score, chunk["index"]))
+
+    # Ties (e.g. no question terms at all) keep the earliest chunks: plain truncation
+    selected = set()
+    used = 0
+    for _, index in sorted(scores):
+        size = chunks[index]["end"] - chunks[index]["start"]
+        if used + size <= budget:
+            selected.add(index)
+            used += size
+    return selected
+
+
+def report_source(label, chunks, selected, copies):
+    if not chunks:
+        detail = f"identical to {', '.join(sorted(copies))}" if copies else "empty"
+        print(f"context:   {label}: {detail}", file=sys.stderr)
+        return
+    kept = [chunk for chunk in chunks if chunk["index"] in selected]
+    size = sum(chunk["end"] - chunk["start"] for chunk in kept)
+    if len(kept) == len(chunks):
+        detail = "all"
+    elif not kept:
+        detail = "omitted"
+    else:
+        detail = f"{len(kept)}/{len(chunks)} chunks"
+    print(f"context:   {label}: {detail} ({size:,} bytes)", file=sys.stderr)
 
 
 def build_prompt(question, focus, context_block):
@@ -162,106 +493,385 @@ def build_followup_prompt(question, focus, context_block):
     return "\n".join(parts)
 
 
-def parse_thread_id(jsonl_output):
-    """Extract thread_id from Codex --json JSONL output."""
-    for line in jsonl_output.strip().split("\n"):
-        if not line:
-            continue
+class RunMetrics:
+    """Timings and token usage of one Codex process, appended as NDJSON.
+
+    Times are milliseconds since just before the process was spawned. Nothing
+    is written unless a metrics path was given.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.started = time.monotonic()
+        self.record = {"script": "codex-oracle", "mode": mode, "started_at": round(time.time(), 3)}
+        self.usage = {}
+
+    def elapsed_ms(self):
+        return round((time.monotonic() - self.started) * 1000, 1)
+
+    def spawned(self):
+        self.record["spawn_ms"] = self.elapsed_ms()
+
+    def observe(self, event):
+        kind = event.get("type")
+        if kind == "thread.started" and "thread_started_ms" not in self.record:
+            self.record["thread_started_ms"] = self.elapsed_ms()
+            self.record["thread_id"] = event.get("thread_id")
+        elif kind == "item.completed" and "first_message_ms" not in self.record:
+            if event.get("item", {}).get("type") == "agent_message":
+                self.record["first_message_ms"] = self.elapsed_ms()
+        elif kind == "turn.completed":
+            for key, value in (event.get("usage") or {}).items():
+                if isinstance(value, int):
+                    self.usage[key] = self.usage.get(key, 0) + value
+
+    def finish(self, returncode):
+        if not self.path:
+            return
+        self.record.update(wall_ms=self.elapsed_ms(), exit_code=returncode, usage=self.usage)
+        line = json.dumps(self.record) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+def session_key(context_files, focus, budget):
+    """Digest of the working directory, focus, budget and context file contents.
+
+    Any edit to a context file changes its content hash and therefore the
+    key, so a stale session is never resumed.
+    """
+    digest = hashlib.sha256()
+    for part in ("codex-oracle-session-v2", os.getcwd(), focus, str(budget)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    for spec in context_files:
+        path, first, last = parse_context_spec(spec)
+        if not os.path.isfile(path):
+            fail(f"Context file not found: {path}")
+        data = open_context(path)
         try:
-            event = json.loads(line)
-            if event.get("type") == "thread.started":
-                return event.get("thread_id")
-        except json.JSONDecodeError:
-            continue
-    return None
+            content = hashlib.sha256(data).hexdigest()
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+        digest.update(f"{os.path.realpath(path)}:{first}-{last}:{content}".encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
 
 
-def run_codex(prompt, session_id, dry_run):
-    output_file = tempfile.NamedTemporaryFile(
-        prefix="codex-oracle-", suffix=".md", delete=False, mode="w"
-    )
-    output_file.close()
+def session_path(key):
+    return os.path.join(SESSION_DIR, f"{key}.json")
+
+
+def lookup_session(key, ttl):
+    """Return the cached thread id for key if it was used within ttl seconds."""
+    try:
+        with open(session_path(key), "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get("last_used", 0) > ttl:
+        return None
+    return entry.get("thread_id")
+
+
+def store_session(key, thread_id, context_files, ttl):
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    now = time.time()
+    path = session_path(key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"thread_id": thread_id, "last_used": now, "context_files": context_files}, f)
+    os.replace(tmp, path)
+
+    # Expired entries can never be resumed again; drop them while we are here
+    for name in os.listdir(SESSION_DIR):
+        entry = os.path.join(SESSION_DIR, name)
+        try:
+            if name.endswith(".json") and now - os.path.getmtime(entry) > ttl:
+                os.unlink(entry)
+        except OSError:
+            pass
+
 
+def forget_session(key):
+    try:
+        os.unlink(session_path(key))
+    except OSError:
+        pass
+
+
+def codex_cmd(output_path, session_id):
     if session_id:
-        cmd = [
+        return [
             "codex", "exec", "resume", session_id,
             "-m", "gpt-5.5",
             "-c", 'model_reasoning_effort="xhigh"',
             "-c", 'approval_policy="never"',
             "--json",
-            "-o", output_file.name,
-            "-",
-        ]
-    else:
-        cmd = [
-            "codex", "exec", "-p", "oracle",
-            "--json",
-            "-o", output_file.name,
+            "-o", output_path,
             "-",
         ]
+    return [
+        "codex", "exec", "-p", "oracle",
+        "--json",
+        "-o", output_path,
+        "-",
+    ]
+
+
+def run_codex(prompt, session_id, dry_run, metrics_path="", emit=print):
+    """Run Codex and pass its answer and session id line to emit; returns (thread_id, returncode)."""
+    output_file = tempfile.NamedTemporaryFile(
+        prefix="codex-oracle-", suffix=".md", delete=False, mode="w"
+    )
+    output_file.close()
+
+    cmd = codex_cmd(output_file.name, session_id)
 
     if dry_run:
+        os.unlink(output_file.name)
         print("=== DRY RUN ===")
         print(f"Command: {' '.join(cmd)}")
         print()
         print("----- BEGIN PROMPT (stdin) -----")
         print(prompt)
         print("----- END PROMPT (stdin) -----")
-        return
-
-    result = subprocess.run(cmd, input=prompt, text=True, capture_output=True)
-
-    thread_id = parse_thread_id(result.stdout)
+        return None, 0
 
     try:
-        with open(output_file.name, "r") as f:
-            print(f.read())
+        metrics = RunMetrics(metrics_path, "resume" if session_id else "new")
+        answer, thread_id, returncode = ask_codex(cmd, prompt, output_file.name, metrics)
+        emit(answer)
     finally:
         os.unlink(output_file.name)
 
     if thread_id:
-        print(f"\noracle-session-id: {thread_id}")
+        emit(f"\noracle-session-id: {thread_id}")
+
+    return thread_id, returncode
+
+
+def ask_codex(cmd, prompt, output_path, metrics):
+    """Run a Codex command on prompt; returns (answer, thread_id, returncode).
+
+    The JSONL event stream is read as it arrives so metrics can time the
+    session start and first message; the prompt is fed from a thread so a
+    large prompt cannot deadlock against a full stdout pipe.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors="replace",
+    )
+    metrics.spawned()
+
+    def feed():
+        try:
+            proc.stdin.write(prompt)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    thread_id = None
+    try:
+        for line in proc.stdout:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(event, dict):
+                continue
+            metrics.observe(event)
+            if thread_id is None and event.get("type") == "thread.started":
+                thread_id = event.get("thread_id")
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        writer.join()
+        metrics.finish(returncode)
+
+    with open(output_path, "r") as f:
+        answer = f.read()
+    return answer, thread_id, returncode
 
-    sys.exit(result.returncode)
+
+def read_batch(source):
+    """Parse batch JSONL from a path or "-" (stdin) into question dicts."""
+    try:
+        if source == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(source, "r") as f:
+                lines = f.read().splitlines()
+    except OSError as e:
+        fail(f"Cannot read batch file {source}: {e.strerror}")
+
+    questions = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            fail(f"{source}:{number}: invalid JSON: {e.msg}")
+        if isinstance(item, str):
+            item = {"question": item}
+        if not isinstance(item, dict) or not isinstance(item.get("question"), str) or not item["question"]:
+            fail(f"{source}:{number}: expected an object with a non-empty \"question\"")
+        context_files = item.get("context_files", [])
+        if not isinstance(context_files, list) or not all(isinstance(p, str) for p in context_files):
+            fail(f"{source}:{number}: \"context_files\" must be a list of paths")
+        for path in context_files:
+            if not os.path.isfile(parse_context_spec(path)[0]):
+                fail(f"{source}:{number}: context file not found: {path}")
+        questions.append({
+            "index": len(questions),
+            "id": item.get("id"),
+            "question": item["question"],
+            "focus": str(item.get("focus") or ""),
+            "session_id": str(item.get("session_id") or ""),
+            "context_files": context_files,
+        })
+    if not questions:
+        fail(f"No questions in {source}")
+    return questions
+
+
+def run_batch(opts):
+    """Answer every batch question concurrently; prints one NDJSON record each."""
+    questions = read_batch(opts["batch"])
+
+    # Shared --context-file content is packed once, ranked against every
+    # question so a budget cut keeps what the batch as a whole needs
+    budget = opts["budget"] or DEFAULT_CONTEXT_TOKENS * BYTES_PER_TOKEN
+    shared = ""
+    if opts["context_files"]:
+        shared, _ = build_context_block(
+            opts["context_files"],
+            " ".join(q["question"] for q in questions),
+            " ".join([opts["focus"]] + [q["focus"] for q in questions]),
+            budget,
+        )
+    # Per-question files get what the shared block left, ranked for that question
+    remaining = max(0, budget - len(shared.encode("utf-8")))
+
+    for q in questions:
+        focus = q["focus"] or opts["focus"]
+        context_block = shared
+        if q["context_files"]:
+            extra, _ = build_context_block(q["context_files"], q["question"], focus, remaining)
+            context_block += extra
+        if q["session_id"]:
+            q["prompt"] = build_followup_prompt(q["question"], focus, context_block)
+        else:
+            q["prompt"] = build_prompt(q["question"], focus, context_block)
+
+    if opts["dry_run"]:
+        print("=== DRY RUN ===")
+        print(f"{len(questions)} questions, {opts['jobs']} at a time")
+        for q in questions:
+            cmd = codex_cmd("<output-file>", q["session_id"])
+            print(f"[{q['index']}] {' '.join(cmd)}  (prompt {len(q['prompt'].encode()):,} bytes)")
+        return 0
+
+    def answer(q):
+        output_file = tempfile.NamedTemporaryFile(
+            prefix="codex-oracle-", suffix=".md", delete=False, mode="w"
+        )
+        output_file.close()
+        started = time.monotonic()
+        try:
+            text, thread_id, returncode = ask_codex(
+                codex_cmd(output_file.name, q["session_id"]),
+                q["prompt"],
+                output_file.name,
+                RunMetrics(opts["metrics"], "batch"),
+            )
+        except OSError as e:
+            text, thread_id, returncode = f"Error: {e}", None, 1
+        finally:
+            os.unlink(output_file.name)
+        return {
+            "index": q["index"],
+            "id": q["id"],
+            "question": q["question"],
+            "session_id": thread_id or q["session_id"] or None,
+            "exit_code": returncode,
+            "duration": round(time.monotonic() - started, 3),
+            "answer": text,
+        }
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=opts["jobs"]) as pool:
+        for future in as_completed([pool.submit(answer, q) for q in questions]):
+            record = future.result()
+            failed += record["exit_code"] != 0
+            print(json.dumps(record), flush=True)
+    return 1 if failed else 0
 
 
 def parse_args(args):
-    question = ""
-    focus = ""
-    session_id = ""
-    dry_run = False
-    context_files = []
+    opts = {
+        "question": "",
+        "focus": "",
+        "session_id": "",
+        "dry_run": False,
+        "context_files": [],
+        "budget": None,
+        "session_cache": True,
+        "session_ttl": DEFAULT_SESSION_TTL,
+        "batch": "",
+        "jobs": DEFAULT_BATCH_JOBS,
+        "metrics": os.environ.get("CODEX_METRICS_FILE", ""),
+    }
     i = 0
     while i < len(args):
-        if args[i] == "--question":
+        if args[i] in ("--question", "--session-id", "--focus", "--batch", "--metrics"):
             if i + 1 >= len(args):
-                fail("--question requires a value")
-            question = args[i + 1]
-            i += 2
-        elif args[i] == "--session-id":
-            if i + 1 >= len(args):
-                fail("--session-id requires a value")
-            session_id = args[i + 1]
-            i += 2
-        elif args[i] == "--focus":
-            if i + 1 >= len(args):
-                fail("--focus requires a value")
-            focus = args[i + 1]
+                fail(f"{args[i]} requires a value")
+            opts[args[i][2:].replace("-", "_")] = args[i + 1]
             i += 2
         elif args[i] == "--context-file":
             if i + 1 >= len(args):
                 fail("--context-file requires a value")
-            context_files.append(args[i + 1])
+            opts["context_files"].append(args[i + 1])
+            i += 2
+        elif args[i] in ("--max-context-bytes", "--max-context-tokens", "--session-ttl", "--jobs"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value")
+            try:
+                value = int(args[i + 1])
+            except ValueError:
+                fail(f"{args[i]} must be an integer, got '{args[i + 1]}'")
+            if value < 1:
+                fail(f"{args[i]} must be positive")
+            if args[i] in ("--session-ttl", "--jobs"):
+                opts[args[i][2:].replace("-", "_")] = value
+            else:
+                opts["budget"] = value if args[i] == "--max-context-bytes" else value * BYTES_PER_TOKEN
             i += 2
+        elif args[i] == "--new-session":
+            opts["session_cache"] = False
+            i += 1
         elif args[i] == "--dry-run":
-            dry_run = True
+            opts["dry_run"] = True
             i += 1
         elif args[i] in ("-h", "--help"):
             usage()
             sys.exit(0)
         else:
             fail(f"Unknown option: {args[i]}")
-    return question, focus, session_id, dry_run, context_files
+    return opts
 
 
 def main():
@@ -271,19 +881,65 @@ def main():
         usage()
         sys.exit(1)
 
-    question, focus, session_id, dry_run, context_files = parse_args(sys.argv[1:])
+    opts = parse_args(sys.argv[1:])
+    question, focus, context_files = opts["question"], opts["focus"], opts["context_files"]
+
+    if opts["batch"]:
+        if question or opts["session_id"]:
+            fail("--batch cannot be combined with --question or --session-id")
+        sys.exit(run_batch(opts))
 
     if not question:
         fail("--question is required")
 
-    context_block = build_context_block(context_files) if context_files else ""
-
-    if session_id:
+    # Only consultations that ship context files are worth resuming: that is
+    # the part a follow-up prompt gets to leave out
+    key = None
+    if context_files and not opts["session_id"] and opts["session_cache"]:
+        key = session_key(context_files, focus, opts["budget"])
+        cached_id = lookup_session(key, opts["session_ttl"])
+        if cached_id:
+            print(
+                f"Resuming oracle session {cached_id} for the same context "
+                f"(--new-session to start fresh)",
+                file=sys.stderr,
+            )
+            prompt = build_followup_prompt(question, focus, "")
+            # Held back until the resume succeeds, so a failed attempt does not
+            # print a partial answer and session id ahead of the fresh run's
+            output = []
+            thread_id, returncode = run_codex(
+                prompt, cached_id, opts["dry_run"], opts["metrics"], emit=output.append
+            )
+            if returncode == 0 or opts["dry_run"]:
+                for text in output:
+                    print(text)
+                if not opts["dry_run"]:
+                    store_session(key, thread_id or cached_id, context_files, opts["session_ttl"])
+                sys.exit(returncode)
+            print("Cached session could not be resumed; starting a new one", file=sys.stderr)
+            forget_session(key)
+
+    context_block = ""
+    if context_files:
+        context_block, complete = build_context_block(context_files, question, focus, opts["budget"])
+        if key and not complete:
+            # The thread would only have seen the chunks ranked for this question
+            print(
+                "Context was trimmed to fit the budget; this session will not be resumed automatically",
+                file=sys.stderr,
+            )
+            key = None
+
+    if opts["session_id"]:
         prompt = build_followup_prompt(question, focus, context_block)
     else:
         prompt = build_prompt(question, focus, context_block)
 
-    run_codex(prompt, session_id, dry_run)
+    thread_id, returncode = run_codex(prompt, opts["session_id"], opts["dry_run"], opts["metrics"])
+    if key and thread_id and returncode == 0:
+        store_session(key, thread_id, context_files, opts["session_ttl"])
+    sys.exit(returncode)
 
 
 if __name__ == "__main__":
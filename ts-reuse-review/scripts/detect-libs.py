@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Detect reuse-relevant libraries across every package of a JS/TS workspace.
+
+Usage:
+    python3 detect-libs.py [options] [ROOT]
+
+Workspace-aware replacement for detect-libs.sh. Manifests are found from
+ROOT/package.json, the globs in its `workspaces` field (npm/yarn, array or
+{"packages": [...]}) and in ROOT/pnpm-workspace.yaml, plus packages/* and
+apps/* as before; `!` globs exclude. All manifests are read and parsed in
+parallel.
+
+Options:
+    --lockfile              Also report the version the lockfile resolved
+                            (package-lock.json, pnpm-lock.yaml or yarn.lock)
+    --jobs <n>              Parallel manifest readers (default: 8)
+    --no-cache              Ignore and do not write the result cache
+
+Output: NDJSON, one line per detected lib, as detect-libs.sh:
+  {"lib":"es-toolkit","group":"general","version":"1.21.0","source":"package.json"}
+With --lockfile, records gain "resolved" when the lockfile pins the lib:
+  {"lib":"zod","group":"schema","version":"^3.23.0","source":"packages/api/package.json","resolved":"3.23.8"}
+
+Groups: general, date, schema, async, http, collection, state
+
+Results are cached under ~/.cache/ts-reuse-review/libs/ (honors
+XDG_CACHE_HOME), keyed on the mtime and size of every manifest, workspace
+config and lockfile, plus every directory the workspace globs walked (so
+adding or removing a package invalidates it). A repeat run only re-stats
+those paths. Exit 2 if ROOT is not a directory; exit 0 even when nothing
+is found.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+
+
+CACHE_VERSION = 1
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "ts-reuse-review",
+    "libs",
+)
+DEFAULT_JOBS = 8
+DEFAULT_GLOBS = ("packages/*", "apps/*")
+SKIP_DIRS = {"node_modules", "dist", "build", ".next", ".git"}
+DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "peerDependencies")
+LOCKFILES = ("pnpm-lock.yaml", "package-lock.json", "yarn.lock")
+
+# group map — edit here to add/remove tracked libs (keep in sync with detect-libs.sh)
+RELEVANT = {
+    # general utils
+    "es-toolkit": "general",
+    "lodash": "general",
+    "lodash-es": "general",
+    "ramda": "general",
+    "remeda": "general",
+    "radash": "general",
+    # date
+    "date-fns": "date",
+    "dayjs": "date",
+    "luxon": "date",
+    "moment": "date",
+    # schema
+    "zod": "schema",
+    "valibot": "schema",
+    "yup": "schema",
+    "superstruct": "schema",
+    "arktype": "schema",
+    "runtypes": "schema",
+    "@effect/schema": "schema",
+    # async / effects
+    "effect": "async",
+    "neverthrow": "async",
+    "ts-pattern": "async",
+    "rxjs": "async",
+    "p-retry": "async",
+    "p-queue": "async",
+    "p-limit": "async",
+    "p-map": "async",
+    # http / query
+    "ky": "http",
+    "ofetch": "http",
+    "@tanstack/react-query": "http",
+    "@tanstack/query-core": "http",
+    "swr": "http",
+    # collection / immutability
+    "immer": "collection",
+    "immutable": "collection",
+    # state
+    "zustand": "state",
+    "jotai": "state",
+    "xstate": "state",
+}
+
+YAML_ITEM_RE = re.compile(r"^\s+-\s+(.*?)\s*$")
+YAML_KEY_RE = re.compile(r"^( *)(['\"]?)([^'\"]+?)\2:(?:\s+(.*?))?\s*$")
+
+
+def fail(msg, code=1):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(code)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def unquote(value):
+    value = value.split(" #", 1)[0].strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def workspace_globs(root, manifest):
+    """Workspace globs from package.json `workspaces` and pnpm-workspace.yaml."""
+    globs = list(DEFAULT_GLOBS)
+    workspaces = (manifest or {}).get("workspaces")
+    if isinstance(workspaces, dict):
+        workspaces = workspaces.get("packages")
+    if isinstance(workspaces, list):
+        globs += [g for g in workspaces if isinstance(g, str)]
+
+    try:
+        with open(os.path.join(root, "pnpm-workspace.yaml"), "r") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        lines = []
+    in_packages = False
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            in_packages = line.split(":", 1)[0].strip() == "packages"
+            continue
+        item = YAML_ITEM_RE.match(line)
+        if in_packages and item:
+            globs.append(unquote(item.group(1)))
+    return globs
+
+
+def expand_glob(root, pattern, visited):
+    """Yield package dirs (relative to root) matching a workspace glob.
+
+    `*` matches one path segment, `**` any number; every directory listed is
+    recorded in visited so the cache notices package directories being added
+    or removed (find_manifests records each candidate's package.json).
+    """
+    parts = [p for p in pattern.strip().strip("/").split("/") if p and p != "."]
+    if parts and parts[-1] == "package.json":
+        parts.pop()
+
+    def listdirs(rel):
+        path = os.path.join(root, rel) if rel else root
+        visited.add(rel or ".")
+        try:
+            with os.scandir(path) as entries:
+                return sorted(
+                    e.name for e in entries
+                    if e.is_dir() and e.name not in SKIP_DIRS and not e.name.startswith(".")
+                )
+        except OSError:
+            return []
+
+    def walk(rel, index):
+        if index == len(parts):
+            yield rel
+            return
+        part = parts[index]
+        if part == "**":
+            yield from walk(rel, index + 1)
+            for name in listdirs(rel):
+                yield from walk(f"{rel}/{name}" if rel else name, index)
+        elif any(c in part for c in "*?["):
+            for name in listdirs(rel):
+                if fnmatch.fnmatchcase(name, part):
+                    yield from walk(f"{rel}/{name}" if rel else name, index + 1)
+        else:
+            child = f"{rel}/{part}" if rel else part
+            visited.add(child)
+            if os.path.isdir(os.path.join(root, child)):
+                yield from walk(child, index + 1)
+
+    yield from walk("", 0)
+
+
+def find_manifests(root, root_manifest, visited):
+    """Relative package.json paths: the root's first, then workspace packages sorted."""
+    include, exclude = [], []
+    for pattern in workspace_globs(root, root_manifest):
+        if pattern.startswith("!"):
+            exclude.append(pattern[1:].strip().strip("/"))
+        else:
+            include.append(pattern)
+
+    found = set()
+    for pattern in include:
+        for rel in expand_glob(root, pattern, visited):
+            if rel and not any(fnmatch.fnmatchcase(rel, ex) for ex in exclude):
+                manifest = f"{rel}/package.json"
+                # Tracked even while missing, so a package.json added later invalidates the cache
+                visited.add(manifest)
+                if os.path.isfile(os.path.join(root, manifest)):
+                    found.add(manifest)
+    manifests = ["package.json"] if root_manifest is not None else []
+    return manifests + sorted(found)
+
+
+def manifest_libs(manifest):
+    """[(lib, group, version)] for tracked libs, dependencies over dev over peer."""
+    libs = []
+    for lib, group in RELEVANT.items():
+        for field in DEPENDENCY_FIELDS:
+            deps = manifest.get(field)
+            if isinstance(deps, dict) and isinstance(deps.get(lib), str) and deps[lib]:
+                libs.append((lib, group, deps[lib]))
+                break
+    return libs
+
+
+def pnpm_resolved(path):
+    """{importer: {lib: version}} from pnpm-lock.yaml (v5 to v9).
+
+    Dependency maps sit under `importers: <path>:` in workspaces and at the
+    top level for single projects; entries are either `lib: <version>` (v5)
+    or `lib:` followed by `specifier:` / `version:` (v6+).
+    """
+    resolved = {}
+    in_importers = False
+    importer = field_indent = lib = None
+    with open(path, "r") as f:
+        for line in f:
+            match = YAML_KEY_RE.match(line.rstrip("\n"))
+            if not match:
+                continue
+            indent, key, value = len(match.group(1)), match.group(3), unquote(match.group(4) or "")
+            if indent == 0:
+                in_importers = key == "importers"
+                importer, field_indent = (".", 0) if key in DEPENDENCY_FIELDS else (None, None)
+                lib = None
+            elif in_importers and indent == 2:
+                importer, field_indent, lib = key, None, None
+            elif in_importers and indent == 4:
+                field_indent = 4 if key in DEPENDENCY_FIELDS else None
+                lib = None
+            elif field_indent is not None and indent == field_indent + 2:
+                lib = key if key in RELEVANT else None
+                if lib and value:
+                    resolved.setdefault(importer, {})[lib] = value.split("(", 1)[0]
+            elif lib and indent == field_indent + 4 and key == "version":
+                resolved.setdefault(importer, {})[lib] = value.split("(", 1)[0]
+    return resolved
+
+
+def npm_resolved(path):
+    """{"node_modules/<lib>" path: version} from package-lock.json v2/v3."""
+    lock = read_json(path) or {}
+    return {
+        key: entry.get("version")
+        for key, entry in (lock.get("packages") or {}).items()
+        if isinstance(entry, dict) and key.rsplit("node_modules/", 1)[-1] in RELEVANT
+    }
+
+
+def yarn_resolved(path):
+    """{"<lib>@<range>": version} from yarn.lock (classic and berry)."""
+    resolved = {}
+    specs = []
+    with open(path, "r") as f:
+        for line in f:
+            if line and not line[0].isspace() and line.rstrip().endswith(":"):
+                specs = [unquote(s) for s in line.rstrip()[:-1].split(",")]
+            elif specs and line.strip().startswith("version"):
+                version = unquote(line.strip()[len("version"):].lstrip(": "))
+                for spec in specs:
+                    resolved[spec.replace("@npm:", "@", 1) if "@npm:" in spec else spec] = version
+                specs = []
+    return resolved
+
+
+def lockfile_lookup(root):
+    """Return (lockfile name, lookup(source, lib, range) -> version or None)."""
+    for name in LOCKFILES:
+        path = os.path.join(root, name)
+        if not os.path.isfile(path):
+            continue
+        if name == "pnpm-lock.yaml":
+            table = pnpm_resolved(path)
+
+            def lookup(source, lib, spec):
+                return table.get(os.path.dirname(source) or ".", {}).get(lib)
+        elif name == "package-lock.json":
+            table = npm_resolved(path)
+
+            def lookup(source, lib, spec):
+                workspace = os.path.dirname(source)
+                nested = f"{workspace}/node_modules/{lib}" if workspace else None
+                return table.get(nested) or table.get(f"node_modules/{lib}")
+        else:
+            table = yarn_resolved(path)
+
+            def lookup(source, lib, spec):
+                return table.get(f"{lib}@{spec}")
+        return name, lookup
+    return None, None
+
+
+def stat_key(root, paths):
+    signature = {}
+    for rel in sorted(paths):
+        try:
+            st = os.stat(os.path.join(root, rel))
+            signature[rel] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            signature[rel] = None
+    return signature
+
+
+def cache_path(root, lockfile):
+    digest = hashlib.sha256(f"{root}\0{lockfile}".encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def cache_load(root, lockfile):
+    try:
+        with open(cache_path(root, lockfile), "r") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("version") != CACHE_VERSION or cached.get("root") != root:
+        return None
+    if stat_key(root, cached["signature"]) != cached["signature"]:
+        return None
+    return cached["records"]
+
+
+def cache_store(root, lockfile, signature, records):
+    path = cache_path(root, lockfile)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {"version": CACHE_VERSION, "root": root, "signature": signature, "records": records}, f
+            )
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write detect-libs cache: {e}", file=sys.stderr)
+
+
+def detect(root, lockfile, jobs):
+    """Return (records, signature paths) for the workspace at root."""
+    root_manifest = read_json(os.path.join(root, "package.json"))
+    visited = set()
+    manifests = find_manifests(root, root_manifest, visited)
+
+    # Imported here: it pulls in logging, which a cached run never needs
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        parsed = list(pool.map(lambda rel: read_json(os.path.join(root, rel)), manifests))
+
+    tracked = ["package.json", "pnpm-workspace.yaml", *manifests, *visited]
+    lookup = None
+    if lockfile:
+        name, lookup = lockfile_lookup(root)
+        tracked += list(LOCKFILES)
+
+    records = []
+    for rel, manifest in zip(manifests, parsed):
+        if not isinstance(manifest, dict):
+            continue
+        for lib, group, version in manifest_libs(manifest):
+            record = {"lib": lib, "group": group, "version": version, "source": rel}
+            resolved = lookup(rel, lib, version) if lookup else None
+            if resolved:
+                record["resolved"] = resolved
+            records.append(record)
+    return records, tracked
+
+
+def parse_args(args):
+    opts = {"root": ".", "lockfile": False, "jobs": DEFAULT_JOBS, "no_cache": False}
+    i = 0
+    while i < len(args):
+        if args[i] == "--jobs":
+            if i + 1 >= len(args):
+                fail("--jobs requires a value", 2)
+            try:
+                opts["jobs"] = int(args[i + 1])
+            except ValueError:
+                fail(f"--jobs must be an integer, got '{args[i + 1]}'", 2)
+            if opts["jobs"] < 1:
+                fail("--jobs must be at least 1", 2)
+            i += 2
+        elif args[i] == "--lockfile":
+            opts["lockfile"] = True
+            i += 1
+        elif args[i] == "--no-cache":
+            opts["no_cache"] = True
+            i += 1
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        elif args[i].startswith("--"):
+            fail(f"Unknown option: {args[i]}", 2)
+        else:
+            opts["root"] = args[i]
+            i += 1
+    return opts
+
+
+def main():
+    opts = parse_args(sys.argv[1:])
+    if not os.path.isdir(opts["root"]):
+        fail(f"ROOT not a directory: {opts['root']}", 2)
+    root = os.path.realpath(opts["root"])
+
+    records = None if opts["no_cache"] else cache_load(root, opts["lockfile"])
+    if records is None:
+        records, tracked = detect(root, opts["lockfile"], opts["jobs"])
+        if not opts["no_cache"]:
+            cache_store(root, opts["lockfile"], stat_key(root, tracked), records)
+    for record in records:
+        print(json.dumps(record, separators=(",", ":")))
+
+
+if __name__ == "__main__":
+    main()
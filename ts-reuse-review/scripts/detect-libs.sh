@@ -33,7 +33,7 @@ if [[ ! -d "$ROOT" ]]; then
     exit 2
 fi
 
-# group map — edit here to add/remove tracked libs
+# group map — edit here to add/remove tracked libs (keep in sync with detect-libs.py)
 declare -a RELEVANT=(
     # general utils
     "es-toolkit:general"
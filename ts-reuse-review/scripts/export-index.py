@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Look up workspace helper exports by name from a persistent index.
+
+Usage:
+    python3 export-index.py [options] NAME [NAME...]
+    echo "chunk debounce" | python3 export-index.py [options] -
+
+Single-process replacement for scan-internal-utils.sh, which starts a
+python3 interpreter per ripgrep match. The first run parses every file in
+the workspace utility directories into an index; later runs re-stat those
+files and re-parse only the ones whose mtime or size changed, then answer
+all NAMEs in one pass.
+
+Indexed exports:
+    export function <name>(...)      kind "function" (also async / function*)
+    export const <name> = ...        kind "const-arrow"
+    export { <name> }                kind "named-export"
+    export { foo as <name> }         kind "named-export" (also `export type {...}`
+                                     and `export {...} from "..."`)
+
+Searched paths (relative to --root), as in scan-internal-utils.sh:
+    src/**/utils/**, src/**/lib/**, src/**/helpers/**
+    packages/*/src/**, apps/*/src/**
+    shared/**, common/**
+    root: utils.*, helpers.*, lib.*
+Extensions .ts/.tsx/.js/.jsx/.mjs/.cjs (root files: .ts/.js/.mjs/.cjs); *.d.ts,
+node_modules/, dist/, build/, .next/ and hidden directories are skipped.
+
+Options:
+    --root <dir>            Workspace root (default: .)
+    --fuzzy                 Also report near matches: same name ignoring case
+                            and _/-, one name containing the other, or a close
+                            spelling with the same first letter (difflib
+                            ratio >= 0.8)
+    --limit <n>             Max fuzzy matches per NAME (default: 10)
+    --rebuild               Discard the index and parse every file again
+
+Output: NDJSON, one line per match:
+    {"name":"chunk","path":"src/utils/array.ts","line":12,"kind":"function",
+     "query":"chunk","match":"exact"}
+Fuzzy matches carry "match":"fuzzy" and a "score" between 0 and 1. A
+summary (files indexed, re-parsed, time) goes to stderr. Exit 0 even if
+nothing matches.
+
+The index lives under ~/.cache/ts-reuse-review/exports/ (honors
+XDG_CACHE_HOME), one file per workspace root.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+
+INDEX_VERSION = 1
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "ts-reuse-review",
+    "exports",
+)
+DEFAULT_LIMIT = 10
+FUZZY_CUTOFF = 0.8
+
+EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+ROOT_FILES = tuple(
+    f"{stem}{ext}" for stem in ("utils", "helpers", "lib") for ext in (".ts", ".js", ".mjs", ".cjs")
+)
+UTIL_DIRS = {"utils", "lib", "helpers"}
+SKIP_DIRS = {"node_modules", "dist", "build", ".next"}
+
+EXPORT_RE = re.compile(
+    r"\bexport\s+(?:async\s+)?function\s*\*?\s*([\w$]+)"
+    r"|\bexport\s+const\s+([\w$]+)\s*(?::[^=]*)?="
+    r"|\bexport\s+(?:type\s+)?\{([^}]*)\}"
+)
+COMMENT_RE = re.compile(r"/\*.*?\*/|//[^\n]*", re.S)
+
+
+def fail(msg, code=1):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(code)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def parse_exports(text):
+    """Return [[name, line, kind]] for the export forms in a source file."""
+    exports = []
+    for match in EXPORT_RE.finditer(text):
+        line = text.count("\n", 0, match.start()) + 1
+        if match.group(1):
+            exports.append([match.group(1), line, "function"])
+        elif match.group(2):
+            exports.append([match.group(2), line, "const-arrow"])
+        else:
+            for piece in COMMENT_RE.sub("", match.group(3)).split(","):
+                piece = piece.strip()
+                if piece.startswith("type "):
+                    piece = piece[5:].strip()
+                name = piece.split(" as ", 1)[-1].strip()
+                if name:
+                    exports.append([name, line, "named-export"])
+    return exports
+
+
+def walk(root, rel):
+    """Yield (relative path, stat) for source files under root/rel, pruning skipped dirs."""
+    stack = [rel]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, current))
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                path = f"{current}/{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS and not entry.name.startswith("."):
+                        stack.append(path)
+                elif entry.name.endswith(EXTENSIONS) and not entry.name.endswith(".d.ts"):
+                    try:
+                        yield path, entry.stat()
+                    except OSError:
+                        continue
+
+
+def candidate_files(root):
+    """Yield (relative path, stat) for every file the search globs cover."""
+    for name in ROOT_FILES:
+        try:
+            yield name, os.stat(os.path.join(root, name))
+        except OSError:
+            pass
+    for path, st in walk(root, "src"):
+        if UTIL_DIRS.intersection(path.split("/")[1:-1]):
+            yield path, st
+    for parent in ("packages", "apps"):
+        try:
+            packages = sorted(os.listdir(os.path.join(root, parent)))
+        except OSError:
+            continue
+        for package in packages:
+            if package not in SKIP_DIRS and not package.startswith("."):
+                yield from walk(root, f"{parent}/{package}/src")
+    for top in ("shared", "common"):
+        yield from walk(root, top)
+
+
+def index_path(root):
+    return os.path.join(CACHE_DIR, hashlib.sha256(root.encode()).hexdigest()[:16] + ".json")
+
+
+def load_index(root):
+    try:
+        with open(index_path(root), "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if index.get("version") != INDEX_VERSION or index.get("root") != root:
+        return {}
+    return index.get("files", {})
+
+
+def save_index(root, files):
+    path = index_path(root)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": INDEX_VERSION, "root": root, "files": files}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write export index: {e}", file=sys.stderr)
+
+
+def update_index(root, rebuild):
+    """Bring the index up to date; returns (files, re-parsed count)."""
+    old = {} if rebuild else load_index(root)
+    files = {}
+    parsed = 0
+    for path, st in candidate_files(root):
+        if path in files:
+            continue
+        entry = old.get(path)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            files[path] = entry
+            continue
+        try:
+            with open(os.path.join(root, path), "r", encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            continue
+        files[path] = [st.st_mtime_ns, st.st_size, parse_exports(text)]
+        parsed += 1
+    if parsed or len(files) != len(old):
+        save_index(root, files)
+    return files, parsed
+
+
+def normalize(name):
+    return name.lower().replace("_", "").replace("-", "").replace("$", "")
+
+
+def records_for(files, names):
+    """Map each wanted name to its {name, path, line, kind} records, in path order."""
+    found = {}
+    for path in sorted(files):
+        for name, line, kind in files[path][2]:
+            if name in names:
+                found.setdefault(name, []).append({"name": name, "path": path, "line": line, "kind": kind})
+    return found
+
+
+def fuzzy_names(files, queries, limit):
+    """Map each query to [(name, score)] of its closest exported names."""
+    by_normalized = {}
+    for entry in files.values():
+        for name, _, _ in entry[2]:
+            by_normalized.setdefault(normalize(name), set()).add(name)
+    normalized_names = list(by_normalized)
+    # Spelling comparisons are limited to names sharing the first letter
+    by_initial = {}
+    for norm in normalized_names:
+        by_initial.setdefault(norm[:1], []).append(norm)
+
+    matches = {}
+    for query in queries:
+        target = normalize(query)
+        candidates = set(
+            difflib.get_close_matches(target, by_initial.get(target[:1], []), n=limit, cutoff=FUZZY_CUTOFF)
+        )
+        if len(target) >= 4:
+            candidates.update(n for n in normalized_names if len(n) >= 4 and (target in n or n in target))
+        scores = {}
+        for norm in candidates:
+            score = 1.0 if norm == target else difflib.SequenceMatcher(None, target, norm).ratio()
+            for name in by_normalized[norm]:
+                if name != query:
+                    scores[name] = score
+        matches[query] = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return matches
+
+
+def lookup(files, queries, fuzzy, limit):
+    """Yield match records for every query, exact matches first."""
+    near = fuzzy_names(files, queries, limit) if fuzzy else {}
+    wanted = set(queries)
+    for ranked in near.values():
+        wanted.update(name for name, _ in ranked)
+    records = records_for(files, wanted)
+
+    for query in queries:
+        for record in records.get(query, []):
+            yield dict(record, query=query, match="exact")
+        for name, score in near.get(query, []):
+            for record in records.get(name, []):
+                yield dict(record, query=query, match="fuzzy", score=round(score, 3))
+
+
+def parse_args(args):
+    opts = {"root": ".", "fuzzy": False, "limit": DEFAULT_LIMIT, "rebuild": False}
+    names = []
+    i = 0
+    while i < len(args):
+        if args[i] in ("--root", "--limit"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value", 2)
+            if args[i] == "--limit":
+                try:
+                    opts["limit"] = int(args[i + 1])
+                except ValueError:
+                    fail(f"--limit must be an integer, got '{args[i + 1]}'", 2)
+            else:
+                opts["root"] = args[i + 1]
+            i += 2
+        elif args[i] in ("--fuzzy", "--rebuild"):
+            opts[args[i][2:]] = True
+            i += 1
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        elif args[i] == "-":
+            names += sys.stdin.read().split()
+            i += 1
+        elif args[i].startswith("--"):
+            fail(f"Unknown option: {args[i]}", 2)
+        else:
+            names.append(args[i])
+            i += 1
+    return names, opts
+
+
+def main():
+    if len(sys.argv) < 2:
+        usage()
+        sys.exit(2)
+    names, opts = parse_args(sys.argv[1:])
+    root = os.path.realpath(opts["root"])
+    if not os.path.isdir(root):
+        fail(f"--root is not a directory: {opts['root']}", 2)
+
+    started = time.perf_counter()
+    files, parsed = update_index(root, opts["rebuild"])
+    matches = 0
+    for record in lookup(files, list(dict.fromkeys(names)), opts["fuzzy"], opts["limit"]):
+        print(json.dumps(record))
+        matches += 1
+    sys.stdout.flush()
+    print(
+        f"export-index: {len(files)} files indexed ({parsed} re-parsed), {matches} matches "
+        f"for {len(names)} names in {time.perf_counter() - started:.2f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Regex fallback for run-patterns when ast-grep is not installed.
+
+Usage:
+    python3 fallback-scan.py [options] FILE [FILE...]
+    git diff --name-only | python3 fallback-scan.py [options] -
+
+Reads the `fallback_regex` of every rule in scripts/patterns/ and compiles
+them into one scanner. Each file is mapped once (mmap) and checked for the
+literal text each rule requires (e.g. "JSON.stringify("); only the rules
+whose anchors occur run their regex, so a typical file costs a few
+substring searches instead of one regex pass per rule. Files are spread
+over a process pool. Non-TS/JS files and *.d.ts are skipped silently.
+
+Options:
+    --jobs <n>              Worker processes (default: CPU count)
+
+Output: NDJSON, one finding per line, in the same shape as run-patterns.py:
+    {"file", "line", "end_line", "column", "rule", "priority", "message",
+     "replace", "text", "confidence": "low"}
+Lines and columns are 1-based. Matches are regex heuristics, not syntax
+trees: expect false positives and treat rule `notes` as the filter. A
+summary goes to stderr.
+
+Each rule reports exactly the matches its fallback_regex finds on its own
+(non-overlapping per rule; different rules' matches may overlap).
+"""
+
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import reuse_rules
+
+
+# Below this many files the process pool costs more than it saves
+POOL_MIN_FILES = 16
+MAX_TEXT = 500
+# Shorter anchors ("=", "{") occur in nearly every file and gate nothing
+MIN_ANCHOR = 3
+
+REGEX_META = set(".^$*+?{}[]()|\\")
+# `\w+` followed by something that cannot start with a word character
+LEADING_WORD_RE = re.compile(r"^\\w\+(?=\\s|\\[.+*(\[]|[=!<>:?,;]|\[[^\]\\\w]+\])")
+
+scanner = None
+
+
+def fail(msg, code=1):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(code)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def top_level_branches(pattern):
+    """Split a regex on `|` outside groups and character classes."""
+    branches, current = [], ""
+    depth, in_class, i = 0, False, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            current += pattern[i:i + 2]
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    return branches + [current]
+
+
+def required_literal(branch):
+    """Longest run of literal text every match of an alternation-free branch contains."""
+    runs, run = [], ""
+    i = 0
+    while i < len(branch):
+        char = branch[i]
+        if char == "\\":
+            token = None if branch[i + 1].isalnum() else branch[i + 1]  # \s, \w, \b, \1 ...
+            i += 2
+        elif char == "[":
+            close = i + 1
+            if branch[close:close + 1] == "^":
+                close += 1
+            if branch[close:close + 1] == "]":
+                close += 1
+            token, i = None, branch.index("]", close) + 1
+        elif char == "(":
+            depth, close = 0, i
+            while True:
+                if branch[close] == "\\":
+                    close += 2
+                    continue
+                if branch[close] == "(":
+                    depth += 1
+                elif branch[close] == ")":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                close += 1
+            token, i = None, close + 1
+        else:
+            token = None if char in REGEX_META else char
+            i += 1
+
+        quantifier = branch[i:i + 1]
+        if quantifier in ("?", "*") or branch.startswith("{0", i):
+            # The token may be absent from a match
+            token = None
+            i = branch.index("}", i) + 1 if quantifier == "{" else i + 1
+        if token is None:
+            runs.append(run)
+            run = ""
+            continue
+        run += token
+        if quantifier in ("+", "{"):
+            # Repeated: the token appears at least once, but text after it may not follow directly
+            runs.append(run)
+            run = ""
+            i = branch.index("}", i) + 1 if quantifier == "{" else i + 1
+    runs.append(run)
+    return max(runs, key=len)
+
+
+def guard_leading_word(pattern):
+    """Anchor a leading `\w+` at a word start.
+
+    A match starting mid-word would need the token after `\w+` to match a
+    word character, which LEADING_WORD_RE rules out, so the matches are the
+    same; re no longer retries every suffix of every long identifier, which
+    dominated the scan time on minified code.
+    """
+    return LEADING_WORD_RE.sub(r"(?<!\\w)\\w+", pattern, count=1)
+
+
+class Scanner:
+    """All rules' fallback regexes, gated by one literal-anchor pass per file.
+
+    Each rule needs a literal from every top-level alternative (e.g.
+    "JSON.stringify(") to be able to match at all. A file is first checked
+    for every anchor; only rules whose anchors are present run their regex.
+    Rules without an anchor of MIN_ANCHOR characters always run.
+    """
+
+    def __init__(self, rules):
+        self.regexes = []
+        self.anchors = {}
+        self.always = []
+        for index, (_, pattern) in enumerate(rules):
+            self.regexes.append(re.compile(guard_leading_word(pattern).encode()))
+            literals = [required_literal(branch) for branch in top_level_branches(pattern)]
+            if all(len(literal) >= MIN_ANCHOR for literal in literals):
+                for literal in literals:
+                    self.anchors.setdefault(literal.encode(), []).append(index)
+            else:
+                self.always.append(index)
+
+    def candidates(self, data):
+        found = set(self.always)
+        for literal, indexes in self.anchors.items():
+            if not found.issuperset(indexes) and data.find(literal) >= 0:
+                found.update(indexes)
+        return sorted(found)
+
+    def scan(self, data):
+        """Return (start, rule index, end) for every rule match in data, by position."""
+        hits = []
+        for index in self.candidates(data):
+            hits += [(match.start(), index, match.end()) for match in self.regexes[index].finditer(data)]
+        hits.sort()
+        return hits
+
+
+def init_worker(rules):
+    global scanner
+    scanner = Scanner(rules)
+
+
+def scan_file(path):
+    """Return [(rule index, line, end_line, column, text)] for one file."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return path, []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                hits = []
+                line, pos = 1, 0
+                for start, index, end in scanner.scan(data):
+                    # Hits arrive in start order, so lines are counted incrementally
+                    line += data[pos:start].count(b"\n")
+                    pos = start
+                    line_start = data.rfind(b"\n", 0, start) + 1
+                    text = data[start:end]
+                    column = len(data[line_start:start].decode("utf-8", "replace")) + 1
+                    hits.append((
+                        index,
+                        line,
+                        line + text.count(b"\n"),
+                        column,
+                        text[:MAX_TEXT].decode("utf-8", "replace"),
+                    ))
+                return path, hits
+    except (OSError, ValueError) as e:
+        print(f"Warning: cannot scan {path}: {e}", file=sys.stderr)
+        return path, []
+
+
+def parse_args(args):
+    opts = {"jobs": os.cpu_count() or 1}
+    files = []
+    i = 0
+    while i < len(args):
+        if args[i] == "--jobs":
+            if i + 1 >= len(args):
+                fail("--jobs requires a value", 2)
+            try:
+                opts["jobs"] = int(args[i + 1])
+            except ValueError:
+                fail(f"--jobs must be an integer, got '{args[i + 1]}'", 2)
+            if opts["jobs"] < 1:
+                fail("--jobs must be at least 1", 2)
+            i += 2
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        elif args[i] == "-":
+            files += [line.strip() for line in sys.stdin if line.strip()]
+            i += 1
+        elif args[i].startswith("--"):
+            fail(f"Unknown option: {args[i]}", 2)
+        else:
+            files.append(args[i])
+            i += 1
+    return files, opts
+
+
+def main():
+    if len(sys.argv) < 2:
+        usage()
+        sys.exit(2)
+    files, opts = parse_args(sys.argv[1:])
+    if not os.path.isdir(reuse_rules.RULE_DIR):
+        fail(f"patterns/ dir missing: {reuse_rules.RULE_DIR}", 4)
+
+    scannable = list(dict.fromkeys(
+        path for path in files if os.path.isfile(path) and reuse_rules.language_for(path)
+    ))
+    if not scannable:
+        return
+
+    started = time.perf_counter()
+    rules = [rule for rule in reuse_rules.load_rules() if rule["metadata"].get("fallback_regex")]
+    patterns = [(rule["id"], rule["metadata"]["fallback_regex"]) for rule in rules]
+
+    if opts["jobs"] > 1 and len(scannable) >= POOL_MIN_FILES:
+        chunksize = max(1, len(scannable) // (opts["jobs"] * 8))
+        pool = ProcessPoolExecutor(opts["jobs"], initializer=init_worker, initargs=(patterns,))
+        results = pool.map(scan_file, scannable, chunksize=chunksize)
+    else:
+        pool = None
+        init_worker(patterns)
+        results = map(scan_file, scannable)
+
+    findings = 0
+    try:
+        for path, hits in results:
+            for index, line, end_line, column, text in hits:
+                record = reuse_rules.finding(rules[index], path, line, end_line, column, text, "low")
+                print(json.dumps(record))
+                findings += 1
+    finally:
+        if pool:
+            pool.shutdown()
+    sys.stdout.flush()
+    print(
+        f"fallback-scan: {len(scannable)} files, {len(rules)} rules, {findings} findings "
+        f"in {time.perf_counter() - started:.2f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Shared loader for the ast-grep rule catalog in scripts/patterns/.
+
+Reads the fields the scan engines need (id, language, message, severity and
+the metadata block) without a YAML dependency. The `rule:` body itself is
+left to ast-grep. Only the YAML shapes the catalog uses are understood:
+top-level and metadata scalars (plain, single- or double-quoted), flow lists
+of double-quoted strings, and `|` / `>` block scalars.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+
+RULE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patterns")
+
+# Extension -> ast-grep language the rules are replayed with (see patterns/README.md)
+LANGUAGES = {
+    ".ts": "TypeScript",
+    ".js": "TypeScript",
+    ".mjs": "TypeScript",
+    ".cjs": "TypeScript",
+    ".tsx": "Tsx",
+    ".jsx": "Tsx",
+}
+
+KEY_RE = re.compile(r"^( *)([A-Za-z_][\w-]*):(?:\s+(.*))?$")
+BLOCK_INDICATORS = ("|", "|-", "|+", ">", ">-", ">+")
+
+
+def language_for(path):
+    """ast-grep language for a source path, or None when it is not TS/JS."""
+    if path.endswith(".d.ts"):
+        return None
+    return LANGUAGES.get(os.path.splitext(path)[1])
+
+
+def parse_scalar(value):
+    value = value.strip()
+    if value[:1] in ('"', "["):
+        # The catalog's double-quoted escapes are the JSON subset of YAML's
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def parse_rule(path):
+    """Return the rule's scalar fields plus a "metadata" dict."""
+    with open(path, "r") as f:
+        lines = f.read().splitlines()
+
+    rule = {"path": path, "metadata": {}}
+    section = None
+    i = 0
+    while i < len(lines):
+        match = KEY_RE.match(lines[i])
+        i += 1
+        if not match:
+            continue
+        indent, key, value = len(match.group(1)), match.group(2), match.group(3) or ""
+        if indent == 0:
+            section = key
+            target = rule
+        elif indent == 2 and section == "metadata":
+            target = rule["metadata"]
+        else:
+            continue
+
+        if value.strip() in BLOCK_INDICATORS:
+            block = []
+            while i < len(lines) and (
+                not lines[i].strip() or len(lines[i]) - len(lines[i].lstrip()) > indent
+            ):
+                block.append(lines[i])
+                i += 1
+            while block and not block[-1].strip():
+                block.pop()
+            margin = min((len(l) - len(l.lstrip()) for l in block if l.strip()), default=0)
+            text = [l[margin:] for l in block]
+            target[key] = " ".join(text) if value.strip().startswith(">") else "\n".join(text)
+        elif value:
+            target[key] = parse_scalar(value)
+    return rule
+
+
+def load_rules(rule_dir=RULE_DIR):
+    """Parse every rule in rule_dir, sorted by file name."""
+    rules = []
+    for name in sorted(os.listdir(rule_dir)):
+        if name.endswith(".yml"):
+            rule = parse_rule(os.path.join(rule_dir, name))
+            if rule.get("id") and rule.get("language"):
+                rules.append(rule)
+    return rules
+
+
+def rule_set_hash(rules):
+    """Digest of every rule file's name and content; changes when any rule does."""
+    digest = hashlib.sha256()
+    for rule in rules:
+        with open(rule["path"], "rb") as f:
+            content = f.read()
+        digest.update(os.path.basename(rule["path"]).encode() + b"\0" + content + b"\0")
+    return digest.hexdigest()
+
+
+def finding(rule, path, line, end_line, column, text, confidence):
+    """One NDJSON finding record, shared by every engine's output."""
+    metadata = rule["metadata"]
+    return {
+        "file": path,
+        "line": line,
+        "end_line": end_line,
+        "column": column,
+        "rule": rule["id"],
+        "priority": metadata.get("priority"),
+        "message": rule.get("message"),
+        "replace": metadata.get("replace_native") or metadata.get("replace_catalog"),
+        "text": text,
+        "confidence": confidence,
+    }
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Run every ast-grep rule over TS/JS/TSX/JSX files in a few batched scans.
+
+Usage:
+    python3 run-patterns.py [options] FILE [FILE...]
+    git diff --name-only | python3 run-patterns.py [options] -
+    python3 run-patterns.py uncommitted [options]
+    python3 run-patterns.py branch [--base <branch>] [options]
+    python3 run-patterns.py commit <SHA> [options]
+
+Batched replacement for run-patterns.sh, which spawns ast-grep once per
+rule per file. The rule set is loaded once; each TypeScript rule also gets
+a Tsx twin (generated once per run) and an sgconfig maps .js/.mjs/.cjs to
+the TypeScript parser and .jsx to Tsx. All files then go through a single
+`ast-grep scan` (one per --batch files) that parses each file once and
+spreads files across --jobs threads. Non-TS/JS files and *.d.ts are
+skipped silently.
+
+Options:
+    --jobs <n>              ast-grep worker threads (default: CPU count)
+    --batch <n>             Max files per ast-grep invocation (default: 1000)
+    --profile               Time each rule on its own and print a per-rule
+                            table to stderr (one ast-grep run per rule)
+    --base <branch>         Base branch for the branch scope (default: main)
+    --no-cache              Scope modes: rescan every file, ignore the cache
+
+Output: NDJSON, one finding per line, as ast-grep reports them:
+    {"file", "line", "end_line", "column", "rule", "priority", "message",
+     "replace", "text", "confidence": "high"}
+Lines and columns are 1-based. A timing summary goes to stderr.
+
+Scope modes (uncommitted, branch, commit) compute the change set
+themselves: new-side hunks come from `git diff -U0` (uncommitted: working
+tree vs HEAD plus untracked files; branch: <base>...HEAD; commit: the
+commit vs its first parent) and only findings whose line range overlaps
+an added or modified line are emitted. Pure deletions are ignored. File
+paths are relative to the repository root. The scanned content is the
+scope's new side: the working tree for uncommitted, the committed blobs
+otherwise.
+
+Scope-mode results are cached per (git blob SHA, rule-set hash, language)
+under ~/.cache/ts-reuse-review/patterns/ (honors XDG_CACHE_HOME). Whole-file
+findings are stored and filtered by hunk on every run, so after a small
+edit only files whose content changed are parsed again, and unchanged files
+across repeated reviews cost nothing. Editing any rule changes the rule-set
+hash; caches for older rule sets are removed on the next scan.
+
+--profile runs each rule (and its Tsx twin) separately, single-threaded,
+across all files in a pool of --jobs workers, and subtracts the cost of
+parsing the same files with a rule that never matches. The table lists
+rules slowest first: rule, language, files, matches, ms.
+
+Exit codes: 2 usage, 3 ast-grep missing, 4 patterns/ missing, 1 scan error.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import reuse_rules
+
+
+DEFAULT_BATCH = 1000
+SCOPES = ("uncommitted", "branch", "commit")
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+# C-style escapes git uses in quoted paths: \", \\, \t, \n and octal bytes
+QUOTED_ESCAPE_RE = re.compile(rb'\\([0-7]{3}|.)')
+QUOTED_ESCAPES = {b"a": b"\a", b"b": b"\b", b"t": b"\t", b"n": b"\n", b"v": b"\v", b"f": b"\f", b"r": b"\r"}
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "ts-reuse-review",
+    "patterns",
+)
+TSX_SUFFIX = "__tsx"
+BASELINE_RULE = """\
+id: tsrr-baseline
+language: {language}
+rule:
+  pattern: $A.__tsrr_baseline_never_matches__()
+"""
+SGCONFIG = """\
+ruleDirs:
+  - rules
+languageGlobs:
+  typescript: ["*.js", "*.mjs", "*.cjs"]
+  tsx: ["*.jsx"]
+"""
+
+
+def fail(msg, code=1):
+    print(f"Error: {msg}", file=sys.stderr)
+    sys.exit(code)
+
+
+def usage():
+    print(__doc__.strip())
+
+
+def tsx_variant(text):
+    """Same rule, replayed with the Tsx parser under a distinct id."""
+    lines = []
+    for line in text.splitlines():
+        if line.startswith("id: "):
+            line += TSX_SUFFIX
+        elif line == "language: TypeScript":
+            line = "language: Tsx"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def write_rule_tree(rules, root):
+    """Write rules (plus Tsx twins) and an sgconfig under root.
+
+    Returns [(rule, language, path)] for every generated rule file.
+    """
+    rule_dir = os.path.join(root, "rules")
+    os.makedirs(rule_dir)
+    variants = []
+    for rule in rules:
+        with open(rule["path"], "r") as f:
+            text = f.read()
+        name = os.path.basename(rule["path"])
+        path = os.path.join(rule_dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        variants.append((rule, rule["language"], path))
+        if rule["language"] == "TypeScript":
+            path = os.path.join(rule_dir, name[:-4] + ".tsx.yml")
+            with open(path, "w") as f:
+                f.write(tsx_variant(text))
+            variants.append((rule, "Tsx", path))
+    with open(os.path.join(root, "sgconfig.yml"), "w") as f:
+        f.write(SGCONFIG)
+    return variants
+
+
+def to_finding(match, rules_by_id):
+    rule_id = match.get("ruleId", "")
+    if rule_id.endswith(TSX_SUFFIX):
+        rule_id = rule_id[: -len(TSX_SUFFIX)]
+    rule = rules_by_id.get(rule_id)
+    if rule is None:
+        return None
+    span = match["range"]
+    return reuse_rules.finding(
+        rule,
+        match["file"],
+        span["start"]["line"] + 1,
+        span["end"]["line"] + 1,
+        span["start"]["column"] + 1,
+        match.get("text", ""),
+        "high",
+    )
+
+
+def ast_grep(args, on_match=None):
+    """Run ast-grep with --json=stream; returns (match count, seconds)."""
+    started = time.perf_counter()
+    # stderr goes to a file: a pipe read only after stdout ends would fill up
+    # on a long run of warnings and stall ast-grep
+    with tempfile.TemporaryFile("w+", errors="replace") as stderr:
+        proc = subprocess.Popen(
+            ["ast-grep", "scan", "--json=stream", *args],
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+            errors="replace",
+        )
+        matches = 0
+        with proc.stdout:
+            for line in proc.stdout:
+                try:
+                    match = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                matches += 1
+                if on_match:
+                    on_match(match)
+        if proc.wait() not in (0, 1):
+            stderr.seek(0)
+            fail(f"ast-grep failed: {stderr.read().strip()}")
+    return matches, time.perf_counter() - started
+
+
+def scan(files, config, rules_by_id, jobs, batch):
+    def emit(match):
+        record = to_finding(match, rules_by_id)
+        if record:
+            print(json.dumps(record))
+
+    total = 0
+    started = time.perf_counter()
+    for i in range(0, len(files), batch):
+        count, _ = ast_grep(["-c", config, "-j", str(jobs), *files[i:i + batch]], emit)
+        total += count
+    sys.stdout.flush()
+    invocations = (len(files) + batch - 1) // batch
+    print(
+        f"run-patterns: {len(files)} files, {len(rules_by_id)} rules, {total} findings "
+        f"in {time.perf_counter() - started:.2f}s ({invocations} ast-grep run(s))",
+        file=sys.stderr,
+    )
+
+
+def git(*args, stdin=None):
+    # quotePath off: non-ASCII paths come through as-is; only names with quotes,
+    # backslashes or control characters are still quoted (see unquote_path)
+    result = subprocess.run(["git", "-c", "core.quotePath=false", *args], input=stdin, capture_output=True)
+    if result.returncode != 0:
+        detail = result.stderr.decode(errors="replace").strip().splitlines()
+        fail(f"git {args[0]} failed: {detail[0] if detail else 'exit ' + str(result.returncode)}")
+    return result.stdout
+
+
+def has_revision(rev):
+    return subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", f"{rev}^{{commit}}"],
+        capture_output=True,
+    ).returncode == 0
+
+
+def unquote_path(name):
+    """Undo git's quoting of a diff header path ("b/a\\tb" -> b/a<TAB>b)."""
+    if not (len(name) > 1 and name.startswith('"') and name.endswith('"')):
+        return name
+    raw = os.fsencode(name[1:-1])
+    raw = QUOTED_ESCAPE_RE.sub(
+        lambda m: bytes([int(m[1], 8)]) if len(m[1]) == 3 else QUOTED_ESCAPES.get(m[1], m[1]),
+        raw,
+    )
+    return os.fsdecode(raw)
+
+
+def parse_hunks(diff):
+    """Map each new-side path to its added/modified line ranges (1-based, inclusive)."""
+    ranges = {}
+    path = None
+    previous = ""
+    for line in diff.splitlines():
+        if line.startswith("+++ ") and previous.startswith("--- "):
+            # git ends names containing spaces with a tab; a tab inside a name is quoted
+            name = unquote_path(line[4:].rstrip("\t"))
+            path = name[2:] if name.startswith("b/") else None
+            if path is not None:
+                ranges.setdefault(path, [])
+        elif line.startswith("@@") and path is not None:
+            match = HUNK_RE.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                if count:
+                    ranges[path].append((start, start + count - 1))
+        previous = line
+    return {path: spans for path, spans in ranges.items() if spans}
+
+
+def scope_changes(scope, target):
+    """Return ({path: ranges}, rev) for a scope; rev None means the working tree."""
+    diff_args = ["diff", "-U0", "--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/"]
+    if scope == "uncommitted":
+        base = "HEAD" if has_revision("HEAD") else EMPTY_TREE
+        changes = parse_hunks(git(*diff_args, base).decode(errors="surrogateescape"))
+        untracked = os.fsdecode(git("ls-files", "-z", "--others", "--exclude-standard")).split("\0")
+        for path in filter(None, untracked):
+            changes[path] = [(1, float("inf"))]
+        return changes, None
+    if scope == "branch":
+        return parse_hunks(git(*diff_args, f"{target}...HEAD").decode(errors="surrogateescape")), "HEAD"
+    parent = f"{target}^" if has_revision(f"{target}^") else EMPTY_TREE
+    return parse_hunks(git(*diff_args, parent, target).decode(errors="surrogateescape")), target
+
+
+def blob_sha(content):
+    """Git's blob id for content, so working-tree files share cache entries with commits."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def tree_blobs(rev, paths):
+    """Map path -> blob SHA at rev for the given paths."""
+    blobs = {}
+    listing = os.fsdecode(git("ls-tree", "-r", "-z", rev, "--", *paths))
+    for entry in filter(None, listing.split("\0")):
+        meta, _, path = entry.partition("\t")
+        mode, kind, sha = meta.split()
+        if kind == "blob":
+            blobs[path] = sha
+    return blobs
+
+
+def read_blobs(shas):
+    """Yield (sha, content) for each blob via one `git cat-file --batch`."""
+    if not shas:
+        return
+    out = git("cat-file", "--batch", stdin="".join(f"{sha}\n" for sha in shas).encode())
+    pos = 0
+    for sha in shas:
+        end = out.index(b"\n", pos)
+        size = int(out[pos:end].split()[2])
+        yield sha, out[end + 1:end + 1 + size]
+        pos = end + 1 + size + 1
+
+
+def cache_path(rule_hash, sha, language):
+    return os.path.join(CACHE_DIR, rule_hash[:16], sha[:2], f"{sha[2:]}.{language}.json")
+
+
+def cache_load(rule_hash, sha, language):
+    try:
+        with open(cache_path(rule_hash, sha, language), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_store(rule_hash, sha, language, records):
+    path = cache_path(rule_hash, sha, language)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(records, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: could not write pattern cache: {e}", file=sys.stderr)
+
+
+def prune_cache(rule_hash):
+    """Drop caches of rule sets other than the current one."""
+    try:
+        names = os.listdir(CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name != rule_hash[:16]:
+            shutil.rmtree(os.path.join(CACHE_DIR, name), ignore_errors=True)
+
+
+def overlaps(record, spans):
+    return any(record["line"] <= end and record["end_line"] >= start for start, end in spans)
+
+
+def scan_scope(scope, target, config, rules, rules_by_id, root, opts):
+    """Scan a git scope's new side and print hunk-overlapping findings."""
+    git("rev-parse", "--git-dir")  # fail fast, with a readable error, outside a repo
+    started = time.perf_counter()
+    os.chdir(os.fsdecode(git("rev-parse", "--show-toplevel").strip()))
+    changes, rev = scope_changes(scope, target)
+    changes = {path: spans for path, spans in changes.items() if reuse_rules.language_for(path)}
+
+    # Blob SHA (and, for the working tree, content) of every changed file
+    blobs, contents = {}, {}
+    if rev is None:
+        for path in changes:
+            try:
+                with open(path, "rb") as f:
+                    contents[path] = f.read()
+            except OSError:
+                continue  # deleted, or a directory such as a submodule
+            blobs[path] = blob_sha(contents[path])
+    elif changes:
+        blobs = tree_blobs(rev, list(changes))
+
+    rule_hash = reuse_rules.rule_set_hash(rules)
+    results, missing = {}, []
+    for path, sha in blobs.items():
+        language = reuse_rules.language_for(path)
+        cached = None if opts["no_cache"] else cache_load(rule_hash, sha, language)
+        if cached is None:
+            missing.append(path)
+        else:
+            results[path] = cached
+
+    # Materialize each missed blob once, named so ast-grep picks its parser
+    scan_dir = os.path.join(root, "blobs")
+    os.makedirs(scan_dir)
+    wanted = {}
+    for path in missing:
+        key = (blobs[path], reuse_rules.language_for(path))
+        wanted.setdefault(key, []).append(path)
+    if rev is not None:
+        contents = {}
+        for sha, content in read_blobs(sorted({sha for sha, _ in wanted})):
+            contents[sha] = content
+    tmp_files = {}
+    for (sha, language), paths in wanted.items():
+        content = contents[paths[0]] if rev is None else contents[sha]
+        tmp = os.path.join(scan_dir, sha + os.path.splitext(paths[0])[1])
+        with open(tmp, "wb") as f:
+            f.write(content)
+        tmp_files[tmp] = (sha, language, paths)
+
+    found = {tmp: [] for tmp in tmp_files}
+
+    def collect(match):
+        record = to_finding(match, rules_by_id)
+        if record and record["file"] in found:
+            found[record["file"]].append(record)
+
+    files = sorted(tmp_files)
+    for i in range(0, len(files), opts["batch"]):
+        ast_grep(["-c", config, "-j", str(opts["jobs"]), *files[i:i + opts["batch"]]], collect)
+    if missing and not opts["no_cache"]:
+        prune_cache(rule_hash)
+    for tmp, (sha, language, paths) in tmp_files.items():
+        records = sorted(found[tmp], key=lambda r: (r["line"], r["column"], r["rule"]))
+        if not opts["no_cache"]:
+            cache_store(rule_hash, sha, language, records)
+        for path in paths:
+            results[path] = records
+
+    emitted = 0
+    for path in sorted(results):
+        for record in results[path]:
+            if overlaps(record, changes[path]):
+                print(json.dumps(dict(record, file=path)))
+                emitted += 1
+    sys.stdout.flush()
+    print(
+        f"run-patterns: {scope} scope, {len(blobs)} changed files "
+        f"({len(blobs) - len(missing)} cached, {len(tmp_files)} scanned), {emitted} findings "
+        f"in changed lines in {time.perf_counter() - started:.2f}s",
+        file=sys.stderr,
+    )
+
+
+def profile(files, variants, rules_by_id, root, jobs):
+    by_language = {"TypeScript": [], "Tsx": []}
+    for path in files:
+        by_language[reuse_rules.language_for(path)].append(path)
+
+    # Parsing cost per language, measured with a rule that never matches
+    baseline = {}
+    for language, paths in by_language.items():
+        if paths:
+            path = os.path.join(root, f"baseline-{language}.yml")
+            with open(path, "w") as f:
+                f.write(BASELINE_RULE.format(language=language))
+            samples = [ast_grep(["-r", path, "-j", "1", *paths])[1] for _ in range(3)]
+            baseline[language] = min(samples)
+
+    def run(variant):
+        rule, language, path = variant
+        found = []
+        count, seconds = ast_grep(["-r", path, "-j", "1", *by_language[language]], found.append)
+        return rule, language, count, seconds, found
+
+    work = [v for v in variants if by_language[v[1]]]
+    rows = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for rule, language, count, seconds, found in pool.map(run, work):
+            for match in found:
+                record = to_finding(match, rules_by_id)
+                if record:
+                    print(json.dumps(record))
+            cost = max(0.0, seconds - baseline[language]) * 1000
+            rows.append((cost, rule["id"], language, len(by_language[language]), count))
+    sys.stdout.flush()
+
+    print("rule\tlanguage\tfiles\tmatches\tms", file=sys.stderr)
+    for cost, rule_id, language, file_count, count in sorted(rows, reverse=True):
+        print(f"{rule_id}\t{language}\t{file_count}\t{count}\t{cost:.1f}", file=sys.stderr)
+    for language, seconds in sorted(baseline.items()):
+        print(f"# parse baseline {language}: {seconds * 1000:.1f} ms", file=sys.stderr)
+
+
+def parse_args(args):
+    opts = {
+        "scope": None,
+        "target": None,
+        "base": "main",
+        "jobs": os.cpu_count() or 1,
+        "batch": DEFAULT_BATCH,
+        "profile": False,
+        "no_cache": False,
+    }
+    files = []
+    i = 0
+    if args and args[0] in SCOPES:
+        opts["scope"] = args[0]
+        i = 1
+        if args[0] == "commit":
+            if len(args) < 2 or args[1].startswith("--"):
+                fail("Usage: run-patterns.py commit <SHA> [options]", 2)
+            opts["target"] = args[1]
+            i = 2
+    while i < len(args):
+        if args[i] == "--base":
+            if i + 1 >= len(args):
+                fail("--base requires a value", 2)
+            opts["base"] = args[i + 1]
+            i += 2
+        elif args[i] == "--no-cache":
+            opts["no_cache"] = True
+            i += 1
+        elif args[i] in ("--jobs", "--batch"):
+            if i + 1 >= len(args):
+                fail(f"{args[i]} requires a value", 2)
+            try:
+                opts[args[i][2:]] = int(args[i + 1])
+            except ValueError:
+                fail(f"{args[i]} must be an integer, got '{args[i + 1]}'", 2)
+            if opts[args[i][2:]] < 1:
+                fail(f"{args[i]} must be at least 1", 2)
+            i += 2
+        elif args[i] == "--profile":
+            opts["profile"] = True
+            i += 1
+        elif args[i] in ("-h", "--help"):
+            usage()
+            sys.exit(0)
+        elif args[i] == "-":
+            files += [line.strip() for line in sys.stdin if line.strip()]
+            i += 1
+        elif args[i].startswith("--") or opts["scope"]:
+            fail(f"Unknown option: {args[i]}", 2)
+        else:
+            files.append(args[i])
+            i += 1
+    if opts["scope"] and opts["profile"]:
+        fail("--profile takes file arguments, not a scope", 2)
+    if opts["scope"] == "branch":
+        opts["target"] = opts["base"]
+    return files, opts
+
+
+def main():
+    if len(sys.argv) < 2:
+        usage()
+        sys.exit(2)
+    files, opts = parse_args(sys.argv[1:])
+
+    if not shutil.which("ast-grep"):
+        fail("ast-grep not found — install: npm i -g @ast-grep/cli", 3)
+    if not os.path.isdir(reuse_rules.RULE_DIR):
+        fail(f"patterns/ dir missing: {reuse_rules.RULE_DIR}", 4)
+
+    if opts["scope"]:
+        scannable = None
+    else:
+        seen = set()
+        scannable = []
+        for path in files:
+            if path not in seen and os.path.isfile(path) and reuse_rules.language_for(path):
+                seen.add(path)
+                scannable.append(path)
+        if not scannable:
+            return
+
+    rules = reuse_rules.load_rules()
+    rules_by_id = {rule["id"]: rule for rule in rules}
+    root = tempfile.mkdtemp(prefix="tsrr-")
+    try:
+        variants = write_rule_tree(rules, root)
+        config = os.path.join(root, "sgconfig.yml")
+        if opts["scope"]:
+            scan_scope(opts["scope"], opts["target"], config, rules, rules_by_id, root, opts)
+        elif opts["profile"]:
+            profile(scannable, variants, rules_by_id, root, opts["jobs"])
+        else:
+            scan(scannable, config, rules_by_id, opts["jobs"], opts["batch"])
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()